@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulated games per second for lineup.LineupSimulator, and how long the full
+9! batting order search takes, on nine synthetic hitters. Run from the repo
+root:
+
+    python -m benchmarks.bench_lineup
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from portfolio.lineup import LineupModel, LineupSimulator, expected_runs, search_orders
+
+
+def synthetic_batting(n=12, seed=0):
+    """A player_batting style frame: n hitters between 60 and 220 plate appearances."""
+    rng = np.random.default_rng(seed)
+    at_bats = rng.integers(50, 190, n)
+    hits = rng.binomial(at_bats, rng.uniform(0.22, 0.36, n))
+    doubles = rng.binomial(hits, 0.2)
+    triples = rng.binomial(hits - doubles, 0.03)
+    homeruns = rng.binomial(hits - doubles - triples, rng.uniform(0.02, 0.15, n))
+    return pd.DataFrame({
+        "Player": [f"Player {i + 1}" for i in range(n)],
+        "at_bats": at_bats, "hits": hits, "doubles": doubles, "triples": triples, "homeruns": homeruns,
+        "walks": rng.binomial(at_bats, 0.1), "hbp": rng.binomial(at_bats, 0.03),
+        "strikeouts": rng.binomial(at_bats - hits, 0.28),
+        "sac_flies": rng.binomial(at_bats, 0.01), "sac_bunts": rng.binomial(at_bats, 0.01),
+    })
+
+
+if __name__ == "__main__":
+    model = LineupModel.from_batting(synthetic_batting())
+    order = model.players
+    sim = LineupSimulator(model, seed=0)
+    for n in (10_000, 100_000):
+        start = time.perf_counter()
+        runs = sim.games(order, n)
+        seconds = time.perf_counter() - start
+        print(f"{n:>7,} games: {seconds * 1000:.0f} ms, {n / seconds:,.0f} games/s, "
+              f"{runs.mean():.3f} runs/game (exact {expected_runs(model, order):.3f})")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        expected_runs(model, order)
+    print(f"expected_runs: {(time.perf_counter() - start) * 10:.2f} ms per order")
+
+    for workers in (1, None):
+        search = search_orders(model, workers=workers)
+        print(f"search_orders(workers={workers}): {search.seconds:.1f}s for {len(search.runs):,} orders, "
+              f"best {search.runs.max():.3f}")
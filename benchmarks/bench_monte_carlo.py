@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulated innings per second for monte_carlo.Simulator on a model fit to a
+synthetic season. Run from the repo root:
+
+    python -m benchmarks.bench_monte_carlo
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_play_classifier import make_corpus
+from portfolio.monte_carlo import Simulator, TransitionModel
+from portfolio.plays import process_games
+
+
+def synthetic_season(plays=20_000, per_game=70):
+    """process_games output with Inning/Half filled in from the third outs."""
+    corpus = make_corpus(plays)
+    games = [pd.DataFrame({"Play Description": corpus[i:i + per_game].tolist()})
+             for i in range(0, plays, per_game)]
+    df = process_games(games)
+    third_out = (df["Outs"].shift(1).fillna(0) > df["Outs"]).to_numpy()
+    half = np.concatenate([[0], np.cumsum(third_out)[:-1]])
+    df["Inning"] = half // 2 + 1
+    df["Half"] = np.where(half % 2 == 0, "Top", "Bottom")
+    return df
+
+
+if __name__ == "__main__":
+    model = TransitionModel.from_plays(synthetic_season())
+    sim = Simulator(model, seed=0)
+    for n in (100_000, 1_000_000):
+        start = time.perf_counter()
+        runs = sim.innings(n)
+        seconds = time.perf_counter() - start
+        print(f"{n:>9,} innings: {seconds * 1000:.0f} ms, {n / seconds:,.0f} innings/s, "
+              f"{runs.mean():.3f} runs/inning")
+
+    start = time.perf_counter()
+    games = sim.games(100_000)
+    print(f"  100,000 games: {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"home win {games.home_win_probability():.3f}")
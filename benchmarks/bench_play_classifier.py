@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark classify_plays against the row-by-row parse_play on a synthetic
+100k-play corpus. Run from the repo root:
+
+    python -m benchmarks.bench_play_classifier
+"""
+
+import random
+import time
+
+import pandas as pd
+
+from portfolio.play_classifier import classify_plays
+from portfolio.plays import parse_play
+
+TEMPLATES = [
+    "{a} singled to left field, RBI; {b} scored.",
+    "{a} singled through the right side; {b} advanced to second.",
+    "{a} doubled down the lf line, 2 RBI; {b} scored; {c} scored.",
+    "{a} tripled to right center, RBI; {b} scored.",
+    "{a} homered to left field, 2 RBI; {b} scored.",
+    "{a} struck out swinging.",
+    "{a} struck out looking.",
+    "{a} grounded out to ss.",
+    "{a} flied out to cf.",
+    "{a} lined out to 2b.",
+    "{a} popped up to 3b.",
+    "{a} walked; {b} advanced to second.",
+    "{a} hit by pitch.",
+    "{a} reached on a fielder's choice; {b} out at second ss to 2b.",
+    "{a} reached on a throwing error by 3b; {b} advanced to third.",
+    "{a} stole second.",
+    "{b} out at second c to ss, caught stealing.",
+    "{a} sacrifice fly to rf, RBI; {b} scored.",
+    "{a} sac bunt to p, SAC; {b} advanced to second.",
+    "Wild pitch; {b} advanced to third.",
+    "Passed ball; {b} advanced to second.",
+    "{a} hit into double play ss to 2b to 1b.",
+    "{a} to p for {b}.",
+    "{a} pinch hit for {b}.",
+    "No play.",
+]
+NAMES = ["Smith", "Jones", "Miller", "Garcia", "Lopez", "Brown", "O'Neil", "Davis", "Kowalski", "Nguyen"]
+
+
+def make_corpus(n=100_000, seed=0):
+    """Play descriptions with batter names and pitch sequences, like the box scores."""
+    rng = random.Random(seed)
+
+    def name():
+        return f"{rng.choice(NAMES)},{rng.choice('ABCDEFGHJKMT')}."
+
+    plays = []
+    for _ in range(n):
+        desc = rng.choice(TEMPLATES).format(a=name(), b=name(), c=name())
+        pitches = "".join(rng.choice("BKFS") for _ in range(rng.randint(1, 7)))
+        plays.append(f"{desc[:-1]} ({rng.randint(0, 3)}-{rng.randint(0, 2)} {pitches}).")
+    return pd.Series(plays)
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    corpus = make_corpus()
+    season = pd.concat([corpus[:6000]] * 17, ignore_index=True)  # same plays re-processed
+
+    for label, plays in [("100k unique-ish plays", corpus), ("100k plays, repeated season", season)]:
+        old_s, old = best_of(lambda: plays.apply(parse_play))
+        new_s, new = best_of(lambda: classify_plays(plays))
+        assert (old.to_numpy() == new.astype(str)).all(), "classify_plays disagrees with parse_play"
+        print(f"{label}: parse_play {old_s * 1000:.0f} ms, classify_plays {new_s * 1000:.0f} ms "
+              f"({old_s / new_s:.1f}x)")
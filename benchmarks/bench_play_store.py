@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File size and load time of a synthetic season as the old CSV (Bases as
+"[1, 0, 0]" strings) versus play_store's Parquet dataset. Run from the repo
+root:
+
+    python -m benchmarks.bench_play_store
+"""
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_monte_carlo import synthetic_season
+from benchmarks.bench_play_classifier import best_of
+from portfolio.monte_carlo import TransitionModel
+from portfolio.play_store import read_plays, write_plays
+from portfolio.plays import season_rows
+
+SIM_COLUMNS = ["Play Type", "Outs", "Bases", "Inning", "Half"]
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+if __name__ == "__main__":
+    df = season_rows(synthetic_season(100_000))
+    old = df.copy()
+    old["Bases"] = [str([b & 1, (b >> 1) & 1, (b >> 2) & 1]) for b in old["Bases"]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "season.csv")
+        root = os.path.join(tmp, "plays")
+        old.to_csv(csv_path, index=False)
+        write_plays(df, root, season=2025, team="Synthetic")
+        write_plays(df.head(1000), root, season=2024, team="Synthetic")
+
+        csv_bytes, pq_bytes = os.path.getsize(csv_path), dir_size(root)
+        print(f"size: csv {csv_bytes / 1e6:.2f} MB, parquet {pq_bytes / 1e6:.2f} MB ({csv_bytes / pq_bytes:.1f}x smaller)")
+
+        # Time to get from disk to a TransitionModel, which is what the simulator needs
+        csv_s, _ = best_of(lambda: TransitionModel.from_plays(pd.read_csv(csv_path)))
+        pq_s, _ = best_of(lambda: TransitionModel.from_plays(read_plays(root, season=2025, columns=SIM_COLUMNS)))
+        print(f"load + fit: csv {csv_s * 1000:.0f} ms, parquet {pq_s * 1000:.0f} ms ({csv_s / pq_s:.1f}x)")
+        one, _ = best_of(lambda: read_plays(root, season=2025, team="Synthetic", innings=(1, 3)))
+        print(f"season=2025, innings 1-3 only: {one * 1000:.0f} ms")
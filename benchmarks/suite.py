@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite for every stage from saved page to simulation input.
+
+The pages come from benchmarks/fixtures (a box score, a team stats page and
+a conference page), so nothing touches the network; --record replaces them
+with live copies. The box score's play-by-play is scaled up to a 100-game
+and a 10-season corpus with plays from make_corpus. Each case is timed on
+its own (best of several runs, like timeit) and once more under
+tracemalloc for peak memory. Results go to benchmarks/results/ as JSON and
+are compared with benchmarks/baseline.json; anything slower or bigger than
+the tolerance is flagged and the exit code is 1. Timings only mean
+something on the machine they came from, so the baseline isn't committed;
+save one before starting on a change. Run from the repo root:
+
+    python -m benchmarks.suite                  # run and compare
+    python -m benchmarks.suite --save-baseline  # run and make this the baseline
+    python -m benchmarks.suite --only process   # cases whose name contains "process"
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_play_classifier import make_corpus
+from portfolio import scrape
+from portfolio.boxscores import PLAY_BY_PLAY
+from portfolio.play_classifier import classify_plays
+from portfolio.plays import combine_innings, parse_play, process_game, process_games, season_rows, update_state
+from portfolio.stats_schema import clean_conference_stats, clean_team_stats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+RESULTS = os.path.join(HERE, "results")
+BASELINE = os.path.join(HERE, "baseline.json")
+SCHEDULE_URL = "https://auwolves.com/sports/baseball/schedule"
+CONFIG = os.path.join(os.path.dirname(HERE), "scrape_config.json")
+
+GAMES = 100
+SEASONS = 10
+GAMES_PER_SEASON = 40
+
+
+def uncomment(html):
+    # Same as fetch_tables: baseball-reference ships most of its tables inside HTML comments
+    return html.replace("<!--", "").replace("-->", "")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name + ".html"), encoding="utf-8") as f:
+        return uncomment(f.read())
+
+
+def record_fixtures():
+    """Overwrite the fixtures with the live pages (needs the network, and Chrome for Sidearm pages)."""
+    from portfolio.boxscores import get_boxscore_links
+    from portfolio.fetch import close_browsers, fetch_html, render_html
+
+    config = scrape.load_config(CONFIG)
+    pages = {
+        "box_score": (get_boxscore_links(SCHEDULE_URL)[0], PLAY_BY_PLAY),
+        "team_stats": (config["teams"][0]["url"], scrape.TEAM_TABLES),
+        "conference": (config["conferences"][0]["url"], scrape.CONFERENCE_TABLES),
+    }
+    try:
+        for name, (url, extractor) in pages.items():
+            html = fetch_html(url)
+            if not extractor.ready(extractor(uncomment(html))):
+                html = render_html(url)
+            with open(os.path.join(FIXTURES, name + ".html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            print(f"Recorded {name} from {url} ({len(html):,} chars)")
+    finally:
+        close_browsers()
+
+
+class Corpus:
+    """Everything the cases run on, built once before any timing starts."""
+
+    def __init__(self, seed=0):
+        self.box_html = read_fixture("box_score")
+        self.team_html = read_fixture("team_stats")
+        self.conference_html = read_fixture("conference")
+
+        # One recorded game's half-inning tables, refilled with different plays per game
+        self.box_tables = PLAY_BY_PLAY.require(PLAY_BY_PLAY(self.box_html), "box_score.html")["plays"]
+        per_game = sum(len(t) for t in self.box_tables)
+        n_games = SEASONS * GAMES_PER_SEASON
+        plays = make_corpus(per_game * n_games, seed=seed).tolist()
+        self.game_tables = [self._refill(plays[g * per_game:(g + 1) * per_game]) for g in range(n_games)]
+        self.games = [combine_innings(tables) for tables in self.game_tables]
+        self.keys = [f"game-{g}" for g in range(n_games)]
+
+        self.plays = pd.concat([g["Play Description"] for g in self.games[:GAMES]], ignore_index=True)
+
+        team = scrape.TEAM_TABLES(self.team_html)
+        self.team_tables = [team["individual_batting"], team["individual_pitching"], team["individual_fielding"]]
+        conference = scrape.CONFERENCE_TABLES(self.conference_html)
+        self.conference_tables = [conference["batting"].assign(Conference="MAC Commonwealth"),
+                                  conference["pitching"].assign(Conference="MAC Commonwealth"),
+                                  conference["standings"].assign(Conference="MAC Commonwealth")]
+
+    def _refill(self, plays):
+        tables, i = [], 0
+        for t in self.box_tables:
+            t = t.copy()
+            t["Play Description"] = plays[i:i + len(t)]
+            i += len(t)
+            tables.append(t)
+        return tables
+
+
+# ---- Cases: each takes the Corpus and returns (callable, items per call, unit) ----
+def extract_box_score(c):
+    return lambda: PLAY_BY_PLAY(c.box_html), 1, "pages"
+
+
+def combine_innings_case(c):
+    tables = c.game_tables[:GAMES]
+    return lambda: [combine_innings(t) for t in tables], GAMES, "games"
+
+
+def parse_play_case(c):
+    return lambda: c.plays.map(parse_play), len(c.plays), "plays"
+
+
+def classify_plays_case(c):
+    return lambda: classify_plays(c.plays), len(c.plays), "plays"
+
+
+def update_state_case(c):
+    # The dict-per-play state machine process_game used to run, one game at a time
+    games = [list(zip(g["Play Description"].map(parse_play), g["Play Description"])) for g in c.games[:GAMES]]
+
+    def run():
+        for plays in games:
+            state = {"outs": 0, "bases": [0, 0, 0], "runs": 0}
+            for play, desc in plays:
+                state = update_state(play, state, desc)
+    return run, sum(len(g) for g in games), "plays"
+
+
+def process_game_case(c):
+    games = c.games[:GAMES]
+    return lambda: [process_game(g) for g in games], sum(len(g) for g in games), "plays"
+
+
+def process_games_seasons(c):
+    return lambda: process_games(c.games, keys=c.keys), sum(len(g) for g in c.games), "plays"
+
+
+def clean_conference_stats_case(c):
+    tables = c.conference_tables
+    return lambda: clean_conference_stats(*tables), sum(len(t) for t in tables), "rows"
+
+
+def clean_team_stats_case(c):
+    tables = c.team_tables
+    return lambda: clean_team_stats(*tables), sum(len(t) for t in tables), "rows"
+
+
+def end_to_end_box_scores(c):
+    # Saved page -> play-by-play tables -> combined game -> state machine -> season rows
+    def run():
+        games = [combine_innings(PLAY_BY_PLAY.require(PLAY_BY_PLAY(c.box_html))["plays"]) for _ in range(GAMES)]
+        return season_rows(process_games(games, keys=c.keys[:GAMES]))
+    return run, GAMES, "games"
+
+
+def end_to_end_team_page(c):
+    extractor = scrape.TEAM_TABLES
+
+    def run():
+        t = extractor.require(extractor(c.team_html))
+        return clean_team_stats(t["individual_batting"], t["individual_pitching"], t["individual_fielding"])
+    return run, 1, "pages"
+
+
+def end_to_end_conference_page(c):
+    extractor = scrape.CONFERENCE_TABLES
+
+    def run():
+        t = extractor.require(extractor(c.conference_html))
+        tables = [t[name].assign(Conference="MAC Commonwealth") for name in ("batting", "pitching", "standings")]
+        return clean_conference_stats(*tables)
+    return run, 1, "pages"
+
+
+CASES = [
+    ("extract_box_score", "stage", extract_box_score),
+    ("combine_innings", "stage", combine_innings_case),
+    ("parse_play", "stage", parse_play_case),
+    ("classify_plays", "stage", classify_plays_case),
+    ("update_state", "stage", update_state_case),
+    ("process_game", "stage", process_game_case),
+    ("process_games_10_seasons", "stage", process_games_seasons),
+    ("clean_conference_stats", "stage", clean_conference_stats_case),
+    ("clean_team_stats", "stage", clean_team_stats_case),
+    ("box_scores_100_games", "end_to_end", end_to_end_box_scores),
+    ("team_page", "end_to_end", end_to_end_team_page),
+    ("conference_page", "end_to_end", end_to_end_conference_page),
+]
+
+
+def measure(fn, repeat=5):
+    """Best seconds per call, timeit-style: enough calls per run to take 0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def peak_memory(fn):
+    """Peak bytes allocated during one call, on top of what was already allocated."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(only=(), repeat=5):
+    start = time.perf_counter()
+    corpus = Corpus()
+    print(f"Corpus: {len(corpus.games)} games, {sum(len(g) for g in corpus.games):,} plays "
+          f"(built in {time.perf_counter() - start:.1f}s)")
+    results = {}
+    for name, stage, setup in CASES:
+        if only and not any(o in name for o in only):
+            continue
+        fn, items, unit = setup(corpus)
+        seconds = measure(fn, repeat)
+        peak = peak_memory(fn)
+        results[name] = {
+            "stage": stage,
+            "seconds": seconds,
+            "items": items,
+            "unit": unit,
+            "per_second": items / seconds,
+            "peak_mb": peak / 2**20,
+        }
+        print(f"  {name:<26} {seconds * 1000:>10.2f} ms  {items / seconds:>14,.0f} {unit}/s  {peak / 2**20:>8.1f} MB")
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count(),
+                    "pandas": pd.__version__, "numpy": np.__version__},
+        "results": results,
+    }
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def compare(run, baseline, tolerance=0.2, memory_tolerance=0.2):
+    """Print each case against the baseline; returns the names that regressed."""
+    if baseline["machine"] != run["machine"]:
+        print(f"⚠️ Baseline is from a different setup ({baseline['machine']}), timings may not be comparable")
+    regressions = []
+    print(f"\nAgainst baseline from {baseline['created']} (tolerance {tolerance:.0%} time, {memory_tolerance:.0%} memory):")
+    for name, new in run["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"  {name:<26} new case, no baseline")
+            continue
+        if old["items"] != new["items"]:
+            print(f"  {name:<26} corpus changed ({old['items']:,} -> {new['items']:,} {new['unit']}), per-item numbers compared")
+        # Per item, so a resized corpus still compares fairly
+        time_ratio = (new["seconds"] / new["items"]) / (old["seconds"] / old["items"])
+        memory_ratio = new["peak_mb"] / old["peak_mb"] if old["peak_mb"] else 1.0
+        flags = []
+        if time_ratio > 1 + tolerance:
+            flags.append("SLOWER")
+        elif time_ratio < 1 - tolerance:
+            flags.append("faster")
+        if memory_ratio > 1 + memory_tolerance:
+            flags.append("MORE MEMORY")
+        if "SLOWER" in flags or "MORE MEMORY" in flags:
+            regressions.append(name)
+        print(f"  {name:<26} time x{time_ratio:.2f}  memory x{memory_ratio:.2f}  {' '.join(flags)}")
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+    else:
+        print("✅ No regressions")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1].strip())
+    parser.add_argument("--only", nargs="+", default=(), help="run cases whose name contains any of these")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case, the best one counts")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown per item, 0.2 = 20%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    parser.add_argument("--record", action="store_true", help="re-record the HTML fixtures from the live sites")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures()
+        return 0
+
+    run = run_suite(args.only, args.repeat)
+    path = os.path.join(RESULTS, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    write_json(path, run)
+    print(f"Results written to {path}")
+
+    if args.save_baseline:
+        if args.only and os.path.exists(args.baseline):
+            # Partial run: only the cases that ran replace their baseline entries
+            with open(args.baseline, encoding="utf-8") as f:
+                saved = json.load(f)
+            run = {**run, "results": {**saved["results"], **run["results"]}}
+        write_json(args.baseline, run)
+        print(f"Saved as the baseline in {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; save one with --save-baseline")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    return 1 if compare(run, baseline, args.tolerance, args.memory_tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Baseball scraping, play-by-play processing and simulation, plus the asset
+KPI queries. Importing the package loads nothing heavy: the names below are
+pulled from their submodules on first use, so
+`from portfolio import parse_play` costs pandas and NumPy but never
+Selenium, SQLAlchemy or pyodbc. The command line is `python -m portfolio`.
+"""
+
+import importlib
+
+# name -> submodule that defines it
+_EXPORTS = {
+    "combine_innings": "plays",
+    "parse_play": "plays",
+    "update_state": "plays",
+    "process_game": "plays",
+    "process_games": "plays",
+    "season_rows": "plays",
+    "classify_plays": "play_classifier",
+    "clean_conference_stats": "stats_schema",
+    "clean_team_stats": "stats_schema",
+    "normalize": "stats_schema",
+    "Simulator": "monte_carlo",
+    "TransitionModel": "monte_carlo",
+    "ChainCache": "markov",
+    "simulate_seasons": "season_sim",
+    "LineupModel": "lineup",
+    "LineupSimulator": "lineup",
+    "search_orders": "lineup",
+    "read_plays": "play_store",
+    "write_plays": "play_store",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'portfolio' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"portfolio.{_EXPORTS[name]}"), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""python -m portfolio <command>; see portfolio.cli."""
+
+import sys
+
+from portfolio.cli import main
+
+sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Queries behind the asset KPIs AssetTracking.py feeds to PowerBI.
+
+Each query is kept as its select list plus its FROM/WHERE body, so the same
+filters produce either the detail rows or a COUNT(DISTINCT ...) that SQL
+Server computes without sending any rows back. Detail results are streamed
+with fetchmany into a Parquet file a chunk at a time.
+"""
+
+import datetime
+import decimal
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from portfolio.instrument import stage
+
+# Serialized assets that should be depreciating but aren't
+SER_NOT_DEPREC_SELECT = """
+        [Item_ID] AS [Item ID],
+        [Item_Name] AS [Item Name],
+        [Item_Group] AS [Item Group],
+        CAST([SerialNumbers_SerialNumber] AS varchar) AS [Serial Number],
+        [SerialNumbers_OriginalCost] AS [Original Purchase Price],
+        [SerialNumbers_PurchaseDate] AS [Purchase Date],
+        [SerialNumbers_BookValue] AS [Net Book Value],
+        [SerialNumbers_OnHand] AS [On Hand Qty],
+        [SerialNumbers_OnRent] AS [On Rent Qty],
+        SerialNumbers_Location"""
+
+# Filters without the purchase date cutoff, which location_metrics passes as a parameter
+SER_NOT_DEPREC_FILTERS = """
+        SerialNumbers_ReadytoDepreciate = 'False'
+      and Item_Type = 'serialized'
+      and SerialNumbers_Location NOT IN ('Lost Equipment', 'Discarded Equipment',' Lost Serial Numbers')
+      and SerialNumbers_DateSold is null
+      and (SerialNumbers_OnHand = 1 or SerialNumbers_OnRent = 1)
+      and SerialNumbers_BookValue is not null and SerialNumbers_BookValue > 0"""
+
+SER_NOT_DEPREC_WHERE = f"""{SER_NOT_DEPREC_FILTERS}
+      and SerialNumbers_PurchaseDate >= '07/01/2019 00:00:00'"""
+
+SER_NOT_DEPREC_BODY = f"""
+    FROM
+        [dbname].[ItemBkt_Exp]
+    WHERE{SER_NOT_DEPREC_WHERE}"""
+
+# Active items at the location that sell and get bought but aren't on auto reorder
+AUTO_REORDER_SELECT = """
+        [ItemID],
+        [ItemName],
+        [LastSaleDt],
+        [LastPurchDt],
+        SUM(IL.[OnHandQty]) AS [OnHandQty],
+        [ItemGroup],
+        ItemType,
+        IL.LocKey"""
+
+AUTO_REORDER_FROM = """
+    FROM [dbname].[Item]
+    LEFT JOIN dbname.ItemBkt IB ON Item.ItemKey = IB.ItemKey
+    LEFT JOIN dbname.ItemLocation IL ON IB.ItemBktKey = IL.ItemBktKey"""
+
+# Filters without the location and the one-year window
+AUTO_REORDER_FILTERS = """
+        AutoReorder = 'False'
+        AND ItemStatus = 'Active'
+        AND ItemName NOT LIKE 'zz%'
+        AND itemID NOT LIKE 'zz%'
+        AND ExcludeFromPurchaseOrder = 'False'
+        AND IL.OnHandQty <> 0"""
+
+AUTO_REORDER_BODY = f"""{AUTO_REORDER_FROM}
+    WHERE{AUTO_REORDER_FILTERS}
+        AND IL.LocKey = 106
+        AND (LastSaleDt >= DATEADD(YEAR, -1, GETDATE()) AND LastPurchDt >= DATEADD(YEAR, -1, GETDATE()))"""
+
+AUTO_REORDER_GROUP = """
+    GROUP BY ItemID, ItemName, LastSaleDt, LastPurchDt, ItemGroup, ItemType, IL.LocKey"""
+
+# Detail queries (no ORDER BY: the sort only cost server time, PowerBI sorts itself)
+SerNotDeprec_query = f"SELECT {SER_NOT_DEPREC_SELECT}{SER_NOT_DEPREC_BODY};"
+AutoReorder_query = f"SELECT DISTINCT {AUTO_REORDER_SELECT}{AUTO_REORDER_BODY}{AUTO_REORDER_GROUP};"
+
+# Both KPIs in one round trip. COUNT(DISTINCT) skips NULLs exactly like nunique() did,
+# and the GROUP BY above can't change which ItemIDs qualify, so it isn't needed here.
+Counts_query = f"""
+SELECT
+    (SELECT COUNT(DISTINCT CAST([SerialNumbers_SerialNumber] AS varchar)) {SER_NOT_DEPREC_BODY}) AS serial_num_count,
+    (SELECT COUNT(DISTINCT [ItemID]) {AUTO_REORDER_BODY}) AS item_ids_count;
+"""
+
+
+def asset_counts(conn, query=Counts_query):
+    """{"serial_num_count": n, "item_ids_count": n} computed on the server."""
+    cursor = conn.cursor()
+    try:
+        with stage("asset_counts"):
+            cursor.execute(query)
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+    finally:
+        cursor.close()
+    return {name: int(value or 0) for name, value in zip(names, row)}
+
+
+def fetch_frame(conn, query, params=()):
+    """Small result sets straight into a DataFrame (pd.read_sql only supports sqlite3 without SQLAlchemy)."""
+    cursor = conn.cursor()
+    try:
+        with stage("fetch_frame") as s:
+            cursor.execute(query, params)
+            names = [d[0] for d in cursor.description]
+            df = pd.DataFrame.from_records([tuple(r) for r in cursor.fetchall()], columns=names)
+            s.rows = len(df)
+        return df
+    finally:
+        cursor.close()
+
+
+# Python types pyodbc reports in cursor.description -> Arrow column types
+ARROW_TYPES = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    decimal.Decimal: pa.float64(),
+    datetime.datetime: pa.timestamp("ms"),
+    datetime.date: pa.date32(),
+}
+
+
+def _arrow_column(values, type_code):
+    arrow_type = ARROW_TYPES.get(type_code)
+    if type_code is decimal.Decimal:
+        values = [None if v is None else float(v) for v in values]
+    if arrow_type is None:
+        # Driver didn't say (sqlite3 never does); let Arrow infer, all-NULL becomes string
+        column = pa.array(values)
+        return column.cast(pa.string()) if pa.types.is_null(column.type) else column
+    return pa.array(values, type=arrow_type)
+
+
+def stream_to_parquet(conn, query, path, chunksize=50_000, params=()):
+    """Run `query` and write its rows to `path` chunk by chunk; returns the row count.
+
+    Only one chunk of rows is in memory at a time. The file's schema comes
+    from the first chunk (and the driver's column types).
+    """
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    writer = None
+    rows_written = 0
+    try:
+        cursor.execute(query, params)
+        names = [d[0] for d in cursor.description]
+        type_codes = [d[1] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            arrays = [_arrow_column(list(c), t) for c, t in zip(columns, type_codes)]
+            if writer is None:
+                schema = pa.schema([(n, a.type) for n, a in zip(names, arrays)])
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            else:
+                arrays = [a.cast(f.type) if a.type != f.type else a for a, f in zip(arrays, writer.schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+            rows_written += len(rows)
+        if writer is None:
+            # No rows: still leave a valid (empty) file so the dashboard refresh doesn't break
+            schema = pa.schema([(n, ARROW_TYPES.get(t, pa.string())) for n, t in zip(names, type_codes)])
+            writer = pq.ParquetWriter(path, schema, compression="zstd")
+    finally:
+        cursor.close()
+        if writer is not None:
+            writer.close()
+    print(f"{path}: {rows_written:,} rows in {time.perf_counter() - start:.1f}s")
+    return rows_written
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dated snapshots of the asset KPIs with incremental refreshes.
+
+The snapshot directory holds:
+    detail.parquet  every serial currently in the "not depreciating" set
+    kpis.csv        one row per refresh: date, serial_num_count, item_ids_count, ...
+    changes.csv     serials added to / removed from the set, with the date
+    state.json      watermark, change tracking version and last full scan
+
+A refresh after the first only asks SQL Server for rows that changed:
+through change tracking when it's enabled on the base table, otherwise
+rows whose purchase or sold date is on or after the last watermark (minus a
+few days of overlap). Changes the dates can't see, like a book value or
+location edit, are caught by checking the updated set against a
+server-side COUNT, which also supplies the day's KPIs: when the two
+disagree the set is rescanned on the spot. A full rescan also runs every
+`full_every_days`.
+"""
+
+import datetime
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from portfolio.asset_metrics import (SER_NOT_DEPREC_SELECT, SER_NOT_DEPREC_WHERE, SerNotDeprec_query, asset_counts,
+                                     fetch_frame, stream_to_parquet)
+
+KEY = "Serial Number"
+
+# Every row that might have entered or left the set since the watermark,
+# flagged with whether it's in the set now
+WATERMARK_DELTA_QUERY = f"""
+SELECT {SER_NOT_DEPREC_SELECT},
+    CASE WHEN {SER_NOT_DEPREC_WHERE} THEN 1 ELSE 0 END AS qualifies
+FROM [dbname].[ItemBkt_Exp]
+WHERE SerialNumbers_PurchaseDate >= ? OR SerialNumbers_DateSold >= ?;
+"""
+
+
+def change_tracking_delta_query(table, key_column):
+    """Changed rows from CHANGETABLE on `table` (the base table behind ItemBkt_Exp).
+
+    Deleted serials come back with only the key, qualifies = 0.
+    """
+    select = SER_NOT_DEPREC_SELECT.replace(
+        "CAST([SerialNumbers_SerialNumber] AS varchar)",
+        f"CAST(COALESCE(E.[SerialNumbers_SerialNumber], CT.[{key_column}]) AS varchar)")
+    return f"""
+SELECT {select},
+    CASE WHEN E.[SerialNumbers_SerialNumber] IS NOT NULL AND {SER_NOT_DEPREC_WHERE} THEN 1 ELSE 0 END AS qualifies
+FROM CHANGETABLE(CHANGES {table}, ?) AS CT
+LEFT JOIN [dbname].[ItemBkt_Exp] AS E ON E.[SerialNumbers_SerialNumber] = CT.[{key_column}];
+"""
+
+
+def _scalar(conn, query, params=()):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def merge_delta(detail, delta):
+    """Apply changed rows to the detail set; returns (new detail, added/removed serials)."""
+    delta = delta.drop_duplicates(subset=KEY, keep="last")
+    changed = delta[KEY]
+    stays = delta[delta["qualifies"] == 1].drop(columns="qualifies")
+    known = set(detail[KEY])
+    now = set(stays[KEY])
+
+    # Only membership changes are logged; re-read rows that stay in the set aren't news
+    added = [k for k in changed if k in now and k not in known]
+    removed = [k for k in changed if k in known and k not in now]
+    changes = pd.DataFrame({KEY: added + removed, "change": ["added"] * len(added) + ["removed"] * len(removed)})
+
+    detail = pd.concat([detail[~detail[KEY].isin(changed)], stays], ignore_index=True)
+    return detail, changes
+
+
+class SnapshotStore:
+    def __init__(self, directory, full_every_days=7, overlap_days=3, change_tracking=None):
+        """`change_tracking` is (base table, key column) if CT is enabled on that table."""
+        self.directory = directory
+        self.full_every_days = full_every_days
+        self.overlap_days = overlap_days
+        self.change_tracking = change_tracking
+        self.detail_path = os.path.join(directory, "detail.parquet")
+        self.kpis_path = os.path.join(directory, "kpis.csv")
+        self.changes_path = os.path.join(directory, "changes.csv")
+        self.state_path = os.path.join(directory, "state.json")
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.state = {}
+
+    def _replace(self, path, write):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=os.path.splitext(path)[1])
+        os.close(fd)
+        write(tmp)
+        os.replace(tmp, path)
+
+    def _save_state(self):
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=1)
+        self._replace(self.state_path, write)
+
+    def _append(self, path, df):
+        df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+    def detail(self):
+        return pd.read_parquet(self.detail_path) if os.path.exists(self.detail_path) else None
+
+    def kpis(self):
+        """The time series for the dashboard."""
+        return pd.read_csv(self.kpis_path, parse_dates=["date"]) if os.path.exists(self.kpis_path) else pd.DataFrame()
+
+    def _mode(self, today, full):
+        last_full = self.state.get("last_full")
+        if full or last_full is None or not os.path.exists(self.detail_path):
+            return "full"
+        if (today - datetime.date.fromisoformat(last_full)).days >= self.full_every_days:
+            return "full"
+        return "change_tracking" if self.change_tracking and self.state.get("ct_version") is not None else "watermark"
+
+    def _ct_version(self, conn):
+        if not self.change_tracking:
+            return None
+        return _scalar(conn, "SELECT CHANGE_TRACKING_CURRENT_VERSION();")
+
+    def _full_scan(self, conn, old, today):
+        # Re-read the whole set; returns (detail, rows read, changes against `old`)
+        self._replace(self.detail_path, lambda tmp: stream_to_parquet(conn, SerNotDeprec_query, tmp))
+        detail = self.detail()
+        changes = None
+        if old is not None:
+            now, before = set(detail[KEY].dropna()), set(old[KEY].dropna())
+            changes = pd.DataFrame({KEY: list(now - before) + list(before - now),
+                                    "change": ["added"] * len(now - before) + ["removed"] * len(before - now)})
+        self.state["last_full"] = today.isoformat()
+        return detail, len(detail), changes
+
+    def refresh(self, conn, full=False, today=None):
+        """Bring the snapshot up to date and append today's KPI row; returns that row."""
+        start = time.perf_counter()
+        today = today or datetime.date.today()
+        mode = self._mode(today, full)
+        # Read the CT version before the data, so nothing committed in between is missed next time
+        ct_version = self._ct_version(conn)
+        if mode == "change_tracking":
+            table, key = self.change_tracking
+            min_valid = _scalar(conn, "SELECT CHANGE_TRACKING_MIN_VALID_VERSION(OBJECT_ID(?));", (table,))
+            if min_valid is None or self.state["ct_version"] < min_valid:
+                mode = "full"  # CT history was cleaned up past our version
+
+        old = self.detail()
+        if mode == "full":
+            detail, rows_read, changes = self._full_scan(conn, old, today)
+        else:
+            if mode == "change_tracking":
+                delta = fetch_frame(conn, change_tracking_delta_query(*self.change_tracking),
+                                    (self.state["ct_version"],))
+            else:
+                since = datetime.datetime.fromisoformat(self.state["watermark"]) - datetime.timedelta(days=self.overlap_days)
+                delta = fetch_frame(conn, WATERMARK_DELTA_QUERY, (since, since))
+            rows_read = len(delta)
+            detail, changes = merge_delta(old, delta)
+
+        # The KPIs always come from the server; a delta that missed a change
+        # (ReadytoDepreciate, OnHand/OnRent or Location edits leave the dates
+        # alone) shows up as a different count and is rescanned right away
+        counts = asset_counts(conn)
+        if mode != "full" and detail[KEY].nunique() != counts["serial_num_count"]:
+            mode += "+full"
+            detail, full_rows, changes = self._full_scan(conn, old, today)
+            rows_read += full_rows
+        elif mode != "full":
+            self._replace(self.detail_path, lambda tmp: detail.to_parquet(tmp, index=False))
+
+        if changes is not None and len(changes):
+            self._append(self.changes_path, changes.assign(date=today.isoformat())[["date", KEY, "change"]])
+
+        row = {
+            "date": today.isoformat(),
+            "serial_num_count": counts["serial_num_count"],
+            "item_ids_count": counts["item_ids_count"],
+            "mode": mode,
+            "rows_read": rows_read,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        self._append(self.kpis_path, pd.DataFrame([row]))
+
+        self.state["watermark"] = datetime.datetime.combine(today, datetime.time()).isoformat()
+        self.state["ct_version"] = ct_version
+        self._save_state()
+        print(f"Snapshot {row['date']} ({mode}): {row['rows_read']:,} rows read, "
+              f"{row['serial_num_count']} serials, {row['item_ids_count']} items, {row['seconds']}s")
+        return row
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Sep  9 19:53:26 2025
+
+@author: tholcomb
+
+The asset KPI refresh behind the PowerBI dashboard: snapshot (or plain
+server-side counts), per-location metrics and optional detail Parquet files.
+pyodbc is imported only when a connection is actually made.
+"""
+
+import functools
+import os
+
+from portfolio.asset_metrics import AutoReorder_query, SerNotDeprec_query, asset_counts, stream_to_parquet
+from portfolio.asset_snapshots import SnapshotStore
+from portfolio.instrument import stage
+from portfolio.location_metrics import LocationMetrics
+
+CONNECTION_STRING = 'DRIVER={SQL Server};SERVER={server name} ;DATABASE={database name};Trusted_Connection=yes;'
+
+
+def odbc_connector(connection_string=CONNECTION_STRING):
+    """Zero-argument callable opening a new pyodbc connection."""
+    import pyodbc
+    return functools.partial(pyodbc.connect, connection_string)
+
+
+def refresh(connect, snapshot=True, loc_keys=(106,), detail=False, snapshot_dir="asset_snapshots",
+            cache_dir=".asset_cache", change_tracking=None):
+    """Run the refresh on connections from `connect()` and return the headline counts."""
+    with stage("connect"):
+        conn = connect()
+    try:
+        if snapshot:
+            # Only rows changed since the last run are read (full rescan once a week).
+            # Pass change_tracking=("dbname.SerialNumbers", "SerialNumber") if CT is on for the base table
+            with stage("snapshot_refresh") as s:
+                counts = SnapshotStore(snapshot_dir, change_tracking=change_tracking).refresh(conn)
+                s.rows = counts["rows_read"]
+        else:
+            # Perform unique counts
+            counts = asset_counts(conn)
+        print(f"Serials not depreciating: {counts['serial_num_count']}, "
+              f"items not on auto reorder: {counts['item_ids_count']}")
+
+        if loc_keys:
+            # Queries run side by side on their own connections from a small pool
+            by_location = LocationMetrics(connect, pool_size=3, ttl=300, cache_dir=cache_dir)
+            try:
+                with stage("location_metrics"):
+                    by_lockey = by_location.metrics(loc_keys)
+            finally:
+                by_location.close()
+            print(by_lockey["item_ids_by_lockey"].to_string(index=False))
+            print(by_lockey["serials_by_location"].to_string(index=False))
+
+        if detail:
+            # Streamed in chunks, never the whole result in memory
+            for query, path in ((SerNotDeprec_query, "SerNotDeprec.parquet"), (AutoReorder_query, "AutoReorder.parquet")):
+                with stage("stream_to_parquet", item=path) as s:
+                    s.rows = stream_to_parquet(conn, query, path)
+                    s.bytes = os.path.getsize(path)
+    finally:
+        conn.close()
+    return counts
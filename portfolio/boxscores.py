@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 24 15:11:54 2025
+
+@author: tholcomb
+
+Box score scraping: schedule page -> box score links -> combined
+play-by-play per game, crawled into a SeasonStore.
+"""
+
+from bs4 import BeautifulSoup
+
+from portfolio.crawler import crawl
+from portfolio.fetch import PLAY_BY_PLAY_TABLE, fetch_html, fetch_tables
+from portfolio.instrument import stage
+from portfolio.plays import combine_innings, process_rows
+from portfolio.season_store import SeasonStore
+from portfolio.table_extract import TableExtractor, TableSignature
+
+# Half-inning tables; the scoring summary also has Play Description but with a Logo column
+PLAY_BY_PLAY = TableExtractor(TableSignature("plays", headers=["Play Description"], exclude=["Logo"], many=True))
+
+
+# === STEP 1: Get all box score links for the team ===
+def get_boxscore_links(schedule_url):
+    """Scrape the schedule page and return all box score URLs."""
+    soup = BeautifulSoup(fetch_html(schedule_url), "html.parser")
+
+    links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        text = a.get_text(strip=True).lower()
+        if "box score" in text and "baseball" in href:
+            if href.startswith("/"):
+                href = "https://auwolves.com" + href
+            links.append(href)
+
+    print(f"Found {len(links)} box score links.")
+    return links
+
+
+# === STEP 2: Get the play-by-play tables from a box score ===
+def get_play_by_play_tables(url):
+    # Static HTML first; only falls back to Chrome when no play-by-play table is in it.
+    # Only the play-by-play tables are parsed, the rest of the box score is skipped
+    result = fetch_tables(url, ready=PLAY_BY_PLAY.ready, wait_xpath=PLAY_BY_PLAY_TABLE, parse=PLAY_BY_PLAY)
+    return PLAY_BY_PLAY.require(result.tables, url)["plays"]
+
+
+# === STEP 3: Scrape and combine one box score ===
+def process_boxscore(link):
+    tables = get_play_by_play_tables(link)
+    with stage("combine_innings", item=link) as s:
+        df = combine_innings(tables)
+        s.rows = len(df)
+    return df
+
+
+def crawl_season(links, directory, recheck=False, workers=8):
+    """Scrape and process every box score not yet in the SeasonStore at `directory`.
+
+    Returns (store, CrawlReport); each result is "skipped", "unchanged",
+    "added" or "updated". Games already in the store never reach the
+    crawler unless `recheck` is set, so a finished season re-runs instantly.
+    """
+    store = SeasonStore(directory)
+    known = set(store.urls())
+    todo = links if recheck else [link for link in links if link not in known]
+
+    def ingest(link):
+        with stage("box_score", item=link):
+            return store.ingest(link, process_boxscore, process_rows, recheck=recheck)
+
+    report = crawl(todo, ingest, workers=workers)
+    if not recheck:
+        for link in known.intersection(links):
+            report.results[link] = "skipped"
+    return store, report
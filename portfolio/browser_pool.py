@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared pool of headless Chrome sessions for the Selenium scrapers.
+
+The chromedriver binary is resolved once per process, and each session is
+reused across pages until it has served `max_pages` pages or raised a
+WebDriverException, at which point it is quit and replaced.
+"""
+
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+from portfolio.instrument import stage
+
+
+def chrome_options():
+    # Same headless setup every scraper used to build by hand
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return chrome_options
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """Bounded pool of long-lived Chrome drivers.
+
+    Borrow a driver with `with pool.driver() as driver:`. At most `size`
+    drivers exist at once; callers block until one is free.
+    """
+
+    def __init__(self, size=2, max_pages=50):
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._driver_path = None
+        self._closed = False
+
+    def driver_path(self):
+        # ChromeDriverManager().install() hits the network, so only do it once
+        with self._lock:
+            if self._driver_path is None:
+                with stage("chromedriver.install"):
+                    self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _start(self):
+        service = Service(self.driver_path())
+        with stage("browser.start"):
+            return _Session(webdriver.Chrome(service=service, options=chrome_options()))
+
+    def _quit(self, session):
+        try:
+            session.driver.quit()
+        except Exception:
+            pass  # already dead, nothing left to clean up
+
+    @contextmanager
+    def driver(self):
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        self._slots.acquire()
+        try:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                session = self._start()
+
+            healthy = True
+            try:
+                yield session.driver
+            except WebDriverException:
+                healthy = False  # crashed or hung session, don't hand it out again
+                raise
+            finally:
+                session.pages += 1
+                if not healthy or self._closed or session.pages >= self.max_pages:
+                    self._quit(session)
+                else:
+                    self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Quit every idle driver and refuse new borrows."""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_pool(size=2, max_pages=50):
+    """Return the process-wide pool, creating it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None or _default_pool._closed:
+            _default_pool = DriverPool(size=size, max_pages=max_pages)
+        return _default_pool
+
+
+def shutdown():
+    """Close the process-wide pool if one was started."""
+    with _default_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+
+
+atexit.register(shutdown)
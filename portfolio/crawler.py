@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrent crawling for box scores and stats pages.
+
+`crawl` runs a function over many URLs on a thread pool and retries
+transient failures with exponential backoff. Politeness is fetch's job: it
+takes a token from the host's bucket (HostLimiter) for every request that
+really goes to the network, so pages served from the cache cost nothing. Anything that still
+fails ends up in the CrawlReport instead of being printed and lost.
+"""
+
+import random
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+# Requests per second per host. baseball-reference blocks anything above 20/min.
+POLITE_RATES = {
+    "baseball-reference.com": 1 / 3,
+    "auwolves.com": 2.0,
+}
+DEFAULT_RATE = 1.0
+
+
+def is_transient(error):
+    """Network and browser hiccups are worth retrying, parse errors and 404s are not."""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    if isinstance(error, requests.RequestException):
+        return True
+    # Selenium is only imported once a page needed the browser; before that no WebDriverException can happen
+    exceptions = sys.modules.get("selenium.common.exceptions")
+    return exceptions is not None and isinstance(error, exceptions.WebDriverException)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holds at most `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """One TokenBucket per host, matched on domain suffix so www. is covered."""
+
+    def __init__(self, rates=POLITE_RATES, default_rate=DEFAULT_RATE, burst=1):
+        self.rates = rates
+        self.default_rate = default_rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def rate_for(self, host):
+        for domain, rate in self.rates.items():
+            if host == domain or host.endswith("." + domain):
+                return rate
+        return self.default_rate
+
+    def wait(self, url):
+        host = urlsplit(url).hostname or ""
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate_for(host), self.burst)
+            bucket = self.buckets[host]
+        bucket.acquire()
+
+
+class CrawlError:
+    def __init__(self, url, attempts, error):
+        self.url = url
+        self.attempts = attempts
+        self.error_type = type(error).__name__
+        self.message = str(error)
+        self.traceback = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+
+    def as_dict(self):
+        return {"url": self.url, "attempts": self.attempts, "error_type": self.error_type, "message": self.message}
+
+    def __repr__(self):
+        return f"CrawlError({self.url!r}, {self.error_type}: {self.message})"
+
+
+class CrawlReport:
+    def __init__(self):
+        self.results = {}
+        self.errors = []
+        self.attempts = {}
+        self.seconds = 0.0
+
+    def ok(self):
+        return not self.errors
+
+    def print_summary(self):
+        retried = sum(1 for n in self.attempts.values() if n > 1)
+        print(f"Crawled {len(self.attempts)} URLs in {self.seconds:.1f}s: "
+              f"{len(self.results)} ok, {len(self.errors)} failed, {retried} retried")
+        for e in self.errors:
+            print(f"❌ {e.url} after {e.attempts} attempt(s): {e.error_type}: {e.message}")
+
+
+def crawl(urls, work, workers=8, limiter=None, retries=3, backoff=1.0, retry_if=is_transient):
+    """Run `work(url)` for every URL concurrently and return a CrawlReport.
+
+    Results are stored by URL in `report.results`. Errors for which
+    `retry_if(error)` is true are retried up to `retries` more times,
+    sleeping backoff * 2**attempt (plus jitter) in between; everything else
+    fails on the first attempt. Pass a HostLimiter as `limiter` to also
+    take a token per attempt, for work that doesn't go through fetch.
+    """
+    report = CrawlReport()
+    lock = threading.Lock()
+
+    def run(url):
+        attempt = 0
+        while True:
+            attempt += 1
+            if limiter is not None:
+                limiter.wait(url)
+            try:
+                result = work(url)
+            except Exception as e:
+                if attempt <= retries and retry_if(e):
+                    time.sleep(backoff * 2 ** (attempt - 1) + random.uniform(0, backoff))
+                    continue
+                with lock:
+                    report.attempts[url] = attempt
+                    report.errors.append(CrawlError(url, attempt, e))
+                return
+            with lock:
+                report.attempts[url] = attempt
+                report.results[url] = result
+            return
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run, urls))
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Page fetching for the scrapers: plain HTTP first, headless Chrome only when
+the tables we need are not in the static HTML.
+
+Every call to `fetch_tables` is recorded in `fetch_log` with the path it
+took ("static" or "browser") and how long it took. Only that summary is
+kept, never the tables, and only for the last FETCH_LOG_SIZE pages, so a
+long crawl doesn't hold on to everything it fetched.
+
+Call `use_cache(PageCache(...))` to put the on-disk page cache under both
+paths; rendered pages are only re-rendered when the static page changed.
+
+Only requests that actually go to the network (a cache miss, an ETag
+revalidation or a browser render) take a token from the per-host
+crawler.HostLimiter, so cached re-runs aren't slowed down by rate limits.
+
+Selenium and the browser pool are only imported the first time a page
+actually needs the browser.
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from io import StringIO
+
+import pandas as pd
+import requests
+
+from portfolio.crawler import HostLimiter
+from portfolio.instrument import stage
+from portfolio.page_cache import CacheMiss
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    )
+}
+
+# XPaths the browser path waits on before reading page_source
+ANY_TABLE = "//table"
+PLAY_BY_PLAY_TABLE = "//table[.//th[contains(., 'Play Description')]]"
+
+FETCH_LOG_SIZE = 10_000
+fetch_log = deque(maxlen=FETCH_LOG_SIZE)
+_log_lock = threading.Lock()
+_local = threading.local()
+_cache = None
+_limiter = HostLimiter()
+
+
+class FetchResult:
+    def __init__(self, url, path, seconds, tables, cache=None):
+        self.url = url
+        self.path = path
+        self.seconds = seconds
+        self.tables = tables
+        self.cache = cache
+
+    def __repr__(self):
+        return (f"FetchResult({self.url!r}, path={self.path!r}, cache={self.cache!r}, "
+                f"seconds={self.seconds:.3f}, tables={len(self.tables)})")
+
+
+class FetchRecord:
+    """What fetch_log keeps about one fetch_tables call."""
+
+    __slots__ = ("url", "path", "cache", "seconds", "tables")
+
+    def __init__(self, result):
+        self.url = result.url
+        self.path = result.path
+        self.cache = result.cache
+        self.seconds = result.seconds
+        self.tables = len(result.tables)
+
+    def __repr__(self):
+        return (f"FetchRecord({self.url!r}, path={self.path!r}, cache={self.cache!r}, "
+                f"seconds={self.seconds:.3f}, tables={self.tables})")
+
+
+def use_cache(cache):
+    """Route every fetch through `cache` (a PageCache), or None to turn it off."""
+    global _cache
+    _cache = cache
+
+
+def use_limiter(limiter):
+    """Pace network requests with `limiter` (a crawler.HostLimiter), or None to turn it off."""
+    global _limiter
+    _limiter = limiter
+
+
+def _wait(url):
+    if _limiter is not None:
+        _limiter.wait(url)
+
+
+def _session():
+    # requests.Session isn't guaranteed thread-safe, so keep one per thread
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+        _local.session.headers.update(HEADERS)
+    return _local.session
+
+
+def _network_get(url, headers=None, timeout=15):
+    # Every request that leaves the machine waits its turn for the host
+    _wait(url)
+    return _session().get(url, headers=headers, timeout=timeout)
+
+
+def read_tables(html):
+    """pd.read_html that returns [] instead of raising when there are no tables."""
+    try:
+        return pd.read_html(StringIO(html))
+    except ValueError:
+        return []
+
+
+def _get_static(url, timeout):
+    # Returns (html, cache status); status is None when no cache is configured
+    with stage("http.get", item=url) as s:
+        if _cache is None:
+            r = _network_get(url, timeout=timeout)
+            r.raise_for_status()
+            html, status = r.text, None
+        else:
+            html, status = _cache.fetch(url, lambda u, headers: _network_get(u, headers, timeout))
+        s.bytes = len(html)
+        return html, status
+
+
+def fetch_html(url, timeout=15):
+    """Plain HTTP GET (through the page cache if one is set), returns the body."""
+    return _get_static(url, timeout)[0]
+
+
+def render_html(url, wait_xpath=ANY_TABLE, min_count=1, timeout=15, loaded=None):
+    """Load `url` in a pooled headless Chrome and return the rendered HTML.
+
+    Waits until at least `min_count` elements match `wait_xpath` and, if
+    given, `loaded(page_source)` is true, instead of sleeping for a fixed time.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    from portfolio.browser_pool import get_pool
+
+    _wait(url)
+    with get_pool().driver() as driver, stage("driver.get", item=url) as s:
+        driver.get(url)
+        WebDriverWait(driver, timeout).until(
+            lambda d: len(d.find_elements(By.XPATH, wait_xpath)) >= min_count
+            and (loaded is None or loaded(d.page_source))
+        )
+        html = driver.page_source
+        s.bytes = len(html)
+        return html
+
+
+def _get_rendered(url, static_status, wait_xpath, min_count, timeout, loaded):
+    # Reuse the cached render while the static page underneath it is unchanged
+    if _cache is None:
+        return render_html(url, wait_xpath, min_count, timeout, loaded), None
+    key = "rendered:" + url
+    html, entry = _cache.lookup(key)
+    if html is not None:
+        if _cache.offline:
+            return html, "offline"
+        if static_status in ("fresh", "revalidated") or _cache.is_fresh(entry):
+            return html, "fresh"
+    elif _cache.offline:
+        raise CacheMiss(f"{url} has no cached render (offline mode)")
+    html = render_html(url, wait_xpath, min_count, timeout, loaded)
+    _cache.put(key, html)
+    return html, "fetched"
+
+
+def has_play_by_play(tables):
+    return any(
+        any("Play Description" in str(col) for col in t.columns)
+        and not any("Logo" in str(col) for col in t.columns)
+        for t in tables
+    )
+
+
+def has_tables(count):
+    return lambda tables: len(tables) >= count
+
+
+def _row_count(tables):
+    # Tables may be a list of frames or a table_extract.Tables of frames / lists of frames
+    frames = tables.values() if isinstance(tables, dict) else tables
+    return sum(sum(len(f) for f in t) if isinstance(t, list) else len(t) for t in frames)
+
+
+def _uncomment(html):
+    # baseball-reference ships most of its tables inside HTML comments
+    return html.replace("<!--", "").replace("-->", "")
+
+
+def _parse(parse, html, url):
+    with stage("parse_tables", item=url) as s:
+        tables = parse(_uncomment(html))
+        s.bytes = len(html)
+        s.rows = _row_count(tables)
+        return tables
+
+
+def fetch_tables(url, ready=has_tables(1), wait_xpath=ANY_TABLE, min_count=1, timeout=15, parse=read_tables):
+    """Return a FetchResult with the tables on `url`.
+
+    Tries a static GET first. Falls back to the browser when the GET is
+    refused with a 403 or `ready(tables)` says the tables we need are missing.
+    `parse(html)` turns the page into tables: every table by default, or a
+    table_extract.TableExtractor to parse only the wanted ones.
+    """
+    start = time.perf_counter()
+    path = "static"
+    status = None
+    try:
+        html, status = _get_static(url, timeout)
+        tables = _parse(parse, html, url)
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code != 403:
+            raise
+        tables = parse("")  # bot check on plain requests, a real browser usually gets through
+
+    if not ready(tables):
+        path = "browser"
+        # The browser waits for the same tables the static page was missing, read the same way
+        html, status = _get_rendered(url, status, wait_xpath, min_count, timeout,
+                                     loaded=lambda page: ready(parse(_uncomment(page))))
+        tables = _parse(parse, html, url)
+
+    result = FetchResult(url, path, time.perf_counter() - start, tables, cache=status)
+    with _log_lock:
+        fetch_log.append(FetchRecord(result))
+    return result
+
+
+def fetch_report():
+    """Print which path every logged URL took and the average time per path."""
+    with _log_lock:
+        log = list(fetch_log)
+    for r in log:
+        print(f"{r.path:>7}  {r.cache or '-':>11}  {r.seconds:6.2f}s  {r.url}")
+    for path in ("static", "browser"):
+        times = [r.seconds for r in log if r.path == path]
+        if times:
+            print(f"{path}: {len(times)} pages, {sum(times) / len(times):.2f}s avg")
+
+
+def close_browsers():
+    """Quit the pooled Chrome sessions, if any page ever needed one."""
+    browser_pool = sys.modules.get("portfolio.browser_pool")
+    if browser_pool is not None:
+        browser_pool.shutdown()
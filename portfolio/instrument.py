@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-stage timing for the scrape-to-simulation pipeline.
+
+Code wraps each stage in `with stage("driver.get", item=url) as s:` and
+sets s.bytes / s.rows when it knows them. Nothing is recorded until a
+script turns it on with use_metrics(Metrics(...)); until then stage() hands
+back a shared do-nothing object. Each finished stage records wall time, CPU
+time of its thread, bytes, rows and peak memory. These records are
+appended to a JSON-lines file as they happen, so a crashed run still leaves
+its numbers behind. close() writes per-stage totals as a Prometheus text
+file (for node_exporter's textfile collector) and the cProfile dumps of the
+slowest items.
+
+Nested stages inherit the item (usually the URL) of the stage around them.
+"""
+
+import contextvars
+import cProfile
+import datetime
+import heapq
+import io
+import itertools
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource  # not on Windows
+except ImportError:
+    resource = None
+
+_current_item = contextvars.ContextVar("instrument_item", default=None)
+
+
+def max_rss_mb():
+    """Process high-water RSS in MB, or None where the OS doesn't say."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KB on Linux
+
+
+class Stage:
+    """One run of one stage; set `bytes` and `rows` inside the with block."""
+
+    def __init__(self, name, item):
+        self.name = name
+        self.item = item
+        self.bytes = 0
+        self.rows = 0
+        self.base = 0  # traced bytes when the stage started
+        self.peak = 0
+        self.error = None
+
+    @property
+    def peak_bytes(self):
+        """Peak Python allocation while the stage ran, above where it started."""
+        return max(self.peak - self.base, 0)
+
+
+class _NullStage:
+    # Handed out while instrumentation is off; assignments are dropped
+    bytes = 0
+    rows = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class StageTotals:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.wall_max = 0.0
+        self.bytes = 0
+        self.rows = 0
+        self.peak = 0
+
+
+class Metrics:
+    """Collects stage records for one run.
+
+    `path` is the JSON-lines file (appended to), `prometheus` the text file
+    (replaced on close). With trace_memory=True, tracemalloc runs for the
+    whole run and each record gets the peak Python allocation while the
+    stage was active, above what was allocated when it started
+    (process-wide, so overlapping stages see each other's allocations);
+    otherwise only the process's high-water RSS is recorded. Stages named in
+    `profile` run under cProfile (one at a time; an item that starts while
+    another is being profiled isn't), and the `profile_top` slowest of each
+    are dumped to `profile_dir` as .prof files.
+    """
+
+    def __init__(self, path=None, prometheus=None, job="pipeline", trace_memory=False,
+                 profile=(), profile_top=3, profile_dir="profiles"):
+        self.path = path
+        self.prometheus = prometheus
+        self.job = job
+        self.run = f"{datetime.datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.started = time.time()
+        self.trace_memory = trace_memory
+        self.profile = set(profile)
+        self.profile_top = profile_top
+        self.profile_dir = profile_dir
+        self.totals = {}
+        self.profiles = {}  # stage -> heap of (wall, seq, item, stats)
+        self._seq = itertools.count()
+        self._active = []
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _bump_peak(self):
+        # Credit the peak since the last reset to every stage running now, then start over
+        peak = tracemalloc.get_traced_memory()[1]
+        for s in self._active:
+            s.peak = max(s.peak, peak)
+        tracemalloc.reset_peak()
+
+    def _start_profile(self, name):
+        if name not in self.profile or not self._profile_lock.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # some other profiler (a debugger, say) is already active
+            self._profile_lock.release()
+            return None
+        return profiler
+
+    def _keep_profile(self, s, wall, profiler):
+        profiler.disable()
+        self._profile_lock.release()
+        with self._lock:
+            heap = self.profiles.setdefault(s.name, [])
+            entry = (wall, next(self._seq), s.item, pstats.Stats(profiler))
+            if len(heap) < self.profile_top:
+                heapq.heappush(heap, entry)
+            elif wall > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+
+    def stage(self, name, item=None):
+        return _Recorder(self, name, item)
+
+    def _finish(self, s, wall, cpu):
+        with self._lock:
+            if self.trace_memory:
+                self._bump_peak()
+                self._active.remove(s)
+            t = self.totals.setdefault(s.name, StageTotals())
+            t.calls += 1
+            t.errors += s.error is not None
+            t.wall += wall
+            t.cpu += cpu
+            t.wall_max = max(t.wall_max, wall)
+            t.bytes += s.bytes
+            t.rows += s.rows
+            t.peak = max(t.peak, s.peak_bytes)
+            if self._file is not None:
+                record = {
+                    "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                    "job": self.job, "run": self.run, "stage": s.name, "item": s.item,
+                    "wall_s": round(wall, 6), "cpu_s": round(cpu, 6), "bytes": s.bytes, "rows": s.rows,
+                    "peak_mb": round(s.peak_bytes / 2**20, 3) if self.trace_memory else None,
+                    "rss_mb": max_rss_mb(), "error": s.error,
+                }
+                self._file.write(json.dumps(record) + "\n")
+                self._file.flush()
+
+    def print_summary(self):
+        print(f"{'stage':<24}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'max s':>9}{'MB in':>9}{'rows':>10}")
+        for name, t in sorted(self.totals.items(), key=lambda kv: -kv[1].wall):
+            print(f"{name:<24}{t.calls:>7}{t.wall:>10.2f}{t.cpu:>10.2f}{t.wall_max:>9.2f}"
+                  f"{t.bytes / 2**20:>9.1f}{t.rows:>10,}" + (f"  ({t.errors} failed)" if t.errors else ""))
+
+    def prometheus_text(self):
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        families = [
+            ("pipeline_stage_calls", "Times each stage ran in the last run.", lambda t: t.calls),
+            ("pipeline_stage_errors", "Stage runs that raised in the last run.", lambda t: t.errors),
+            ("pipeline_stage_wall_seconds", "Wall time summed over a stage's runs.", lambda t: t.wall),
+            ("pipeline_stage_cpu_seconds", "CPU time summed over a stage's runs.", lambda t: t.cpu),
+            ("pipeline_stage_wall_seconds_max", "Slowest single run of a stage.", lambda t: t.wall_max),
+            ("pipeline_stage_bytes", "Bytes fetched or read by a stage.", lambda t: t.bytes),
+            ("pipeline_stage_rows", "Rows produced by a stage.", lambda t: t.rows),
+        ]
+        if self.trace_memory:
+            families.append(("pipeline_stage_peak_memory_bytes", "Largest rise in Python allocations during one run of a stage.",
+                             lambda t: t.peak))
+        lines = []
+        for metric, help_text, value in families:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for name, t in sorted(self.totals.items()):
+                lines.append(f'{metric}{{job="{label(self.job)}",stage="{label(name)}"}} {value(t)}')
+        lines += ["# HELP pipeline_run_duration_seconds Wall time of the whole run.",
+                  "# TYPE pipeline_run_duration_seconds gauge",
+                  f'pipeline_run_duration_seconds{{job="{label(self.job)}"}} {time.time() - self.started:.3f}',
+                  "# HELP pipeline_last_run_timestamp_seconds When the run finished.",
+                  "# TYPE pipeline_last_run_timestamp_seconds gauge",
+                  f'pipeline_last_run_timestamp_seconds{{job="{label(self.job)}"}} {time.time():.0f}']
+        rss = max_rss_mb()
+        if rss is not None:
+            lines += ["# HELP pipeline_max_rss_bytes High-water resident memory of the run.",
+                      "# TYPE pipeline_max_rss_bytes gauge",
+                      f'pipeline_max_rss_bytes{{job="{label(self.job)}"}} {int(rss * 2**20)}']
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        # Written then renamed, so the collector never reads half a file
+        path = path or self.prometheus
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def save_profiles(self, top_functions=15):
+        """Dump the kept profiles and print the top functions of each stage's slowest item."""
+        if not self.profiles:
+            return []
+        os.makedirs(self.profile_dir, exist_ok=True)
+        paths = []
+        for name, heap in self.profiles.items():
+            for rank, (wall, _, item, stats) in enumerate(sorted(heap, key=lambda e: -e[0]), start=1):
+                path = os.path.join(self.profile_dir, f"{self.run}-{name}-{rank}.prof")
+                stats.dump_stats(path)
+                paths.append(path)
+                if rank == 1:
+                    out = io.StringIO()
+                    stats.stream = out
+                    stats.sort_stats("cumulative").print_stats(top_functions)
+                    print(f"Slowest {name} ({wall:.2f}s, {item}):\n{out.getvalue()}")
+        return paths
+
+    def close(self):
+        if self.prometheus:
+            self.write_prometheus()
+        self.save_profiles()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.trace_memory:
+            tracemalloc.stop()
+
+
+class _Recorder:
+    def __init__(self, metrics, name, item):
+        self.metrics = metrics
+        self.stage = Stage(name, item if item is not None else _current_item.get())
+
+    def __enter__(self):
+        m = self.metrics
+        if m.trace_memory:
+            with m._lock:
+                m._bump_peak()
+                self.stage.base = self.stage.peak = tracemalloc.get_traced_memory()[0]
+                m._active.append(self.stage)
+        self.token = _current_item.set(self.stage.item)
+        self.profiler = m._start_profile(self.stage.name)
+        self.cpu = time.thread_time()
+        self.start = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu
+        _current_item.reset(self.token)
+        if exc_type is not None:
+            self.stage.error = f"{exc_type.__name__}: {exc}"
+        if self.profiler is not None:
+            self.metrics._keep_profile(self.stage, wall, self.profiler)
+        self.metrics._finish(self.stage, wall, cpu)
+        return False
+
+
+_metrics = None
+
+
+def use_metrics(metrics):
+    """Record every stage() from now on into `metrics` (None turns recording off)."""
+    global _metrics
+    _metrics = metrics
+    return metrics
+
+
+def stage(name, item=None):
+    """Context manager timing one stage; a no-op unless use_metrics() was called."""
+    if _metrics is None:
+        return _NULL
+    return _metrics.stage(name, item)
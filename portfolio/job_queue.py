@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent job queue for long batch scrapes.
+
+Every job (keyed by its URL) and its status lives in one JSON file that is
+rewritten atomically on each change, so a run that crashes or gets killed
+can be started again and picks up only what isn't done yet. Jobs that were
+"running" when the process died go back to "pending".
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class JobQueue:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.jobs = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.jobs = {}
+        # Anything left running belongs to a process that's gone
+        for job in self.jobs.values():
+            if job["status"] == RUNNING:
+                job["status"] = PENDING
+        self._save()
+
+    def _save(self):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.jobs, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def _update(self, key, **fields):
+        with self.lock:
+            job = self.jobs[key]
+            job.update(fields, updated=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self._save()
+            return dict(job)
+
+    def add(self, key, **fields):
+        """Queue a job unless it's already known with the same fields.
+
+        Done jobs stay done, but a job whose fields changed since it was
+        queued (a new season_year for the same URL, say) starts over.
+        """
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and all(job.get(name) == value for name, value in fields.items()):
+                return False
+            self.jobs[key] = {**fields, "status": PENDING, "attempts": 0, "error": None}
+            self._save()
+            return True
+
+    def pending(self, retry_failed=True):
+        wanted = {PENDING, FAILED} if retry_failed else {PENDING}
+        with self.lock:
+            return [k for k, job in self.jobs.items() if job["status"] in wanted]
+
+    def start(self, key):
+        return self._update(key, status=RUNNING, attempts=self.jobs[key]["attempts"] + 1)
+
+    def done(self, key, result=None):
+        return self._update(key, status=DONE, error=None, result=result)
+
+    def fail(self, key, error):
+        return self._update(key, status=FAILED, error=f"{type(error).__name__}: {error}")
+
+    def reset(self, status=DONE):
+        """Put every job with `status` back to pending (e.g. to re-scrape a finished season)."""
+        with self.lock:
+            for job in self.jobs.values():
+                if job["status"] == status:
+                    job["status"] = PENDING
+            self._save()
+
+    def counts(self):
+        with self.lock:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self.jobs.values():
+                counts[job["status"]] += 1
+            return counts
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batter-by-batter simulation and batting order search.
+
+Each hitter in the `individual_batting` frame clean_team_stats returns gets
+his own P(walk, hbp, single, double, triple, homer, strikeout, out) per
+plate appearance, regressed toward the team with `prior_pa` pseudo plate
+appearances. Plays go through state_engine's tables, so runners move the
+same way they do in monte_carlo and markov.
+
+Two ways to score an order:
+
+* LineupSimulator plays whole games for one order, every trial in lockstep
+  as NumPy arrays (like monte_carlo.Simulator, but whose turn it is matters).
+* expected_runs / search_orders solve the chain exactly: an inning led off
+  by a given slot has expected runs R[s] and a distribution T[s, s'] over
+  who leads off the next one, and nine innings are nine steps of that.
+
+The search covers all 9! orders. The first time through the order only
+depends on the batters so far, so the 986,409 distinct prefixes are each
+pushed through one plate appearance instead of 9 * 362,880 of them; only
+innings still alive after nine batters (about 1 in 100) are carried
+further. An inning led off by slot s of an order is the inning led off by
+slot 0 of its rotation, so inning values are solved once per permutation
+and looked up for all nine slots. The nine leadoff hitters' subtrees run in
+parallel processes.
+"""
+
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from portfolio.state_engine import INNING_OVER, N_STATES, NEXT_STATE, PLAY_CODE, PLAY_TYPES, RUNS
+from portfolio.streaming import Estimate, Histogram, Welford, run_until
+
+# What a line in the batting table can say about a plate appearance. Sac
+# flies, sac bunts and GDPs are counted as plain outs: without the base-out
+# state they happened in they can't be given state-dependent odds.
+BATTER_PLAYS = ["Walk", "Hit by Pitch", "Single", "Double", "Triple", "Home Run", "Strikeout", "Out"]
+SLOTS = 9
+
+_NEXT = NEXT_STATE.ravel().astype(np.int64)
+_RUNS = RUNS.ravel().astype(np.int64)
+_OVER = INNING_OVER.ravel()
+
+
+def batter_counts(batting):
+    """Plate appearances and BATTER_PLAYS counts per player from a player_batting frame."""
+    def col(name):
+        return pd.to_numeric(batting[name], errors="coerce").fillna(0).to_numpy(dtype=float) \
+            if name in batting.columns else np.zeros(len(batting))
+
+    walks, hbp, hits, strikeouts = col("walks"), col("hbp"), col("hits"), col("strikeouts")
+    doubles, triples, homeruns = col("doubles"), col("triples"), col("homeruns")
+    pa = col("at_bats") + walks + hbp + col("sac_flies") + col("sac_bunts")
+    singles = np.clip(hits - doubles - triples - homeruns, 0, None)
+    on_base = walks + hbp + singles + doubles + triples + homeruns
+    outs = np.clip(pa - on_base - strikeouts, 0, None)
+    counts = np.column_stack([walks, hbp, singles, doubles, triples, homeruns, strikeouts, outs])
+    # Player since stats_schema keeps the team pages' name; CSVs from before have player
+    names = batting["Player"] if "Player" in batting.columns else batting["player"]
+    counts = pd.DataFrame(counts, index=names.astype(str).to_numpy(), columns=BATTER_PLAYS)
+    # A player listed twice (traded, or a duplicated row) is one hitter
+    return counts.groupby(level=0, sort=False).sum()
+
+
+def batter_probabilities(batting, prior_pa=50.0):
+    """P(play type) per plate appearance for every player, shrunk toward the team's mix."""
+    counts = batter_counts(batting)
+    team = counts.sum(axis=0)
+    if team.sum() == 0:
+        raise ValueError("No plate appearances in the batting frame.")
+    probs = counts + prior_pa * team / team.sum()
+    return probs.div(probs.sum(axis=1), axis=0)
+
+
+class LineupModel:
+    """Per-batter chain tables for the nine (or more) players a lineup is built from.
+
+    play_probs has shape (n_players, len(PLAY_TYPES)). For batter b, stay[b]
+    is P(state -> state) with the inning going on, runs[b] the expected runs
+    his plate appearance scores from each state and ends[b] the chance it's
+    the third out.
+    """
+
+    def __init__(self, probs):
+        self.players = list(probs.index)
+        self.play_probs = np.zeros((len(probs), len(PLAY_TYPES)))
+        for play in probs.columns:
+            self.play_probs[:, PLAY_CODE[play]] = probs[play].to_numpy(dtype=float)
+
+        n, k = self.play_probs.shape
+        rows = np.repeat(np.arange(N_STATES), k)
+        stay = ~_OVER
+        self.stay = np.zeros((n, N_STATES, N_STATES))
+        self.runs = np.zeros((n, N_STATES))
+        self.ends = np.zeros((n, N_STATES))
+        for b in range(n):
+            prob = np.tile(self.play_probs[b], N_STATES)
+            np.add.at(self.stay[b], (rows[stay], _NEXT[stay]), prob[stay])
+            self.runs[b] = np.bincount(rows, weights=prob * _RUNS, minlength=N_STATES)
+            self.ends[b] = np.bincount(rows[_OVER], weights=prob[_OVER], minlength=N_STATES)
+
+        cdf = np.cumsum(self.play_probs, axis=1)
+        cdf[:, -1] = 1.0
+        # Same trick as TransitionModel: one sorted array, offset per batter
+        self._flat_cdf = (np.arange(n)[:, None] + cdf).ravel()
+
+    @classmethod
+    def from_batting(cls, batting, players=None, prior_pa=50.0):
+        """Model for `players` (default: the nine with the most plate appearances)."""
+        probs = batter_probabilities(batting, prior_pa)
+        if players is None:
+            pa = batter_counts(batting).sum(axis=1)
+            players = pa.sort_values(ascending=False, kind="stable").index[:SLOTS]
+        missing = [p for p in players if p not in probs.index]
+        if missing:
+            raise KeyError(f"Not in the batting frame: {missing}")
+        return cls(probs.loc[list(players)])
+
+    def order_index(self, order):
+        """Player names (or indices) -> an int array of model rows."""
+        index = {name: i for i, name in enumerate(self.players)}
+        order = np.array([index[p] if p in index else int(p) for p in order], dtype=np.int64)
+        if len(order) != SLOTS or len(set(order.tolist())) != SLOTS:
+            raise ValueError(f"A batting order is {SLOTS} different players, got {list(order)}")
+        return order
+
+    def step(self, x, batters):
+        """One plate appearance for every row: live-state distribution x, batter per row.
+
+        Returns the distribution after it, plus expected runs and P(third out) on it.
+        """
+        after = np.empty_like(x)
+        for b in np.unique(batters):
+            rows = batters == b
+            after[rows] = x[rows] @ self.stay[b]
+        return after, (x * self.runs[batters]).sum(axis=1), (x * self.ends[batters]).sum(axis=1)
+
+    def sample(self, states, batters, rng):
+        """Draw one play for each (state, batter); returns flat (state, play) table indices."""
+        k = len(PLAY_TYPES)
+        codes = np.searchsorted(self._flat_cdf, batters + rng.random(len(batters)), side="right") - batters * k
+        return states * k + codes
+
+
+# ---- exact evaluation ----
+def _laps(model, orders, x, runs, exits, tol=1e-10, max_laps=20):
+    """Keep going around the order until every inning is over (to within tol).
+
+    exits[:, k] collects P(slot k makes the third out); rows whose inning
+    is already over are dropped as they die out.
+    """
+    live = np.arange(len(orders))
+    for _ in range(max_laps):
+        keep = x.sum(axis=1) > tol
+        live, x = live[keep], x[keep]
+        if not len(live):
+            break
+        for k in range(SLOTS):
+            x, r, e = model.step(x, orders[live, k])
+            runs[live] += r
+            exits[live, k] += e
+    return runs, exits
+
+
+def _start(n):
+    x = np.zeros((n, N_STATES))
+    x[:, 0] = 1.0
+    return x
+
+
+def inning_values(model, orders):
+    """Expected runs and exit distribution of an inning led off by slot 0, per order."""
+    orders = np.atleast_2d(orders)
+    n = len(orders)
+    return _laps(model, orders, _start(n), np.zeros(n), np.zeros((n, SLOTS)))
+
+
+def _leadoff_subtree(model, first):
+    """inning_values for the 8! orders led off by `first`, in lexicographic order.
+
+    The first lap walks the prefix tree a level at a time: level k holds
+    each distinct (k + 1)-batter prefix once, and its children copy its
+    state before their own batter steps.
+    """
+    rest = [b for b in range(SLOTS) if b != first]
+    orders = np.array([(first,) + p for p in itertools.permutations(rest)], dtype=np.int64)
+    x, runs, exits = _start(1), np.zeros(1), np.zeros((1, 0))
+    for k in range(SLOTS):
+        level = orders[::math.factorial(SLOTS - 1 - k)]
+        if k:
+            parent = np.arange(len(level)) // (SLOTS - k)
+            x, runs, exits = x[parent], runs[parent], exits[parent]
+        x, r, e = model.step(x, level[:, k])
+        runs = runs + r
+        exits = np.column_stack([exits, e])
+    return _laps(model, orders, x, runs, exits, tol=1e-10)
+
+
+def _rank(perms):
+    """Lexicographic index of each row among the permutations of 0..8 (Lehmer code)."""
+    rank = np.zeros(len(perms), dtype=np.int64)
+    for i in range(SLOTS - 1):
+        smaller = (perms[:, i + 1:] < perms[:, i:i + 1]).sum(axis=1)
+        rank += smaller * math.factorial(SLOTS - 1 - i)
+    return rank
+
+
+def _game_runs(R, T, innings=9):
+    """Expected runs over `innings` from per-slot inning runs R (n, 9) and leadoff transitions T (n, 9, 9)."""
+    lead = np.zeros(R.shape)
+    lead[:, 0] = 1.0
+    total = np.zeros(len(R))
+    for _ in range(innings):
+        total += (lead * R).sum(axis=1)
+        lead = np.einsum("ns,nst->nt", lead, T)
+    return total
+
+
+def _slot_tables(inning_runs, inning_exits):
+    """R and T for orders from the slot-0 inning values of their nine rotations (rotation s in column s)."""
+    n = len(inning_runs)
+    R = inning_runs
+    T = np.empty((n, SLOTS, SLOTS))
+    for s in range(SLOTS):
+        # Slot k of the rotation is slot s + k of the order; the next inning starts one after
+        T[:, s] = np.roll(inning_exits[:, s], s + 1, axis=1)
+    return R, T
+
+
+def expected_runs(model, order, innings=9):
+    """Exact expected runs over `innings` for one batting order (names or indices)."""
+    order = model.order_index(order)
+    rotations = np.array([np.roll(order, -s) for s in range(SLOTS)])
+    runs, exits = inning_values(model, rotations)
+    R, T = _slot_tables(runs[None, :], exits[None, :, :])
+    return float(_game_runs(R, T, innings)[0])
+
+
+class OrderSearch:
+    """Expected runs for every batting order of the model's first nine players."""
+
+    def __init__(self, players, orders, runs, seconds):
+        self.players = players
+        self.orders = orders  # (9!, 9) model rows, lexicographic
+        self.runs = runs  # (9!,) expected runs per game
+        self.seconds = seconds
+
+    def top(self, n=10):
+        best = np.argsort(-self.runs, kind="stable")[:n]
+        return pd.DataFrame({
+            "order": [" / ".join(self.players[b] for b in self.orders[i]) for i in best],
+            "expected_runs": self.runs[best],
+        })
+
+    def best(self):
+        return [self.players[b] for b in self.orders[int(np.argmax(self.runs))]]
+
+    def summary(self):
+        return {
+            "orders": len(self.runs),
+            "best": float(self.runs.max()),
+            "median": float(np.median(self.runs)),
+            "worst": float(self.runs.min()),
+            "seconds": self.seconds,
+        }
+
+
+def search_orders(model, innings=9, workers=None, chunk=40_320):
+    """Score all 362,880 orders of the model's first nine players exactly.
+
+    Each leadoff hitter's 8! orders are one job on a process pool; the
+    rotation lookup and the nine-inning recursion run here afterwards.
+    """
+    if len(model.players) != SLOTS:
+        raise ValueError(f"The search needs exactly {SLOTS} players, the model has {len(model.players)}")
+    start = time.perf_counter()
+    workers = workers or min(SLOTS, os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_leadoff_subtree, itertools.repeat(model, SLOTS), range(SLOTS)))
+    else:
+        parts = [_leadoff_subtree(model, first) for first in range(SLOTS)]
+    inning_runs = np.concatenate([p[0] for p in parts])
+    inning_exits = np.concatenate([p[1] for p in parts])
+
+    orders = np.array(list(itertools.permutations(range(SLOTS))), dtype=np.int64)
+    runs = np.empty(len(orders))
+    for lo in range(0, len(orders), chunk):
+        block = orders[lo:lo + chunk]
+        ranks = np.column_stack([_rank(np.roll(block, -s, axis=1)) for s in range(SLOTS)])
+        R, T = _slot_tables(inning_runs[ranks], inning_exits[ranks])
+        runs[lo:lo + chunk] = _game_runs(R, T, innings)
+    return OrderSearch(model.players, orders, runs, time.perf_counter() - start)
+
+
+# ---- simulation ----
+class LineupSimulator:
+    """Seeded, vectorized games for one batting order."""
+
+    def __init__(self, model, seed=None, max_plays=400):
+        self.model = model
+        self.rng = np.random.default_rng(seed)
+        self.max_plays = max_plays  # safety cap per game
+
+    def games(self, order, n, innings=9):
+        """Runs scored in each of `n` simulated games of `innings` innings."""
+        order = self.model.order_index(order)
+        runs = np.zeros(n, dtype=np.int64)
+        states = np.zeros(n, dtype=np.int64)
+        slots = np.zeros(n, dtype=np.int64)
+        played = np.zeros(n, dtype=np.int64)
+        active = np.arange(n)
+
+        for _ in range(self.max_plays):
+            if not len(active):
+                break
+            idx = self.model.sample(states, order[slots], self.rng)
+            runs[active] += _RUNS[idx]
+            over = _OVER[idx]
+            played[active] += over
+            # The third out state is 0 in NEXT_STATE, so a new inning starts empty
+            states = _NEXT[idx]
+            slots = (slots + 1) % SLOTS
+            keep = played[active] < innings
+            active, states, slots = active[keep], states[keep], slots[keep]
+        return runs
+
+    def estimate_runs(self, order, target_width=0.05, innings=9, confidence=0.95,
+                      batch=20_000, max_trials=2_000_000):
+        """Mean runs per game for `order`, to +/- target_width / 2."""
+        runs_mean, runs_hist = Welford(), Histogram()
+
+        def step(n):
+            runs = self.games(order, n, innings)
+            runs_mean.update(runs)
+            runs_hist.update(runs)
+
+        run_until(step, runs_mean, target_width, confidence, batch, batch, max_trials)
+        return Estimate("runs", runs_mean, confidence, target_width, {"histogram": runs_hist})
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asset KPIs for many locations at once.
+
+The LocKeys and date cutoffs are query parameters instead of literals, and
+each metric is one GROUP BY pass over every requested location. The date
+math (one year back, the purchase cutoff) happens in Python, so the same
+SQL runs on SQL Server and on a SQLite stand-in. Independent queries run
+concurrently, each on its own connection from a small pool, and results are
+cached for `ttl` seconds so dashboard refreshes inside that window don't
+touch the database.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from portfolio.asset_metrics import AUTO_REORDER_FILTERS, AUTO_REORDER_FROM, SER_NOT_DEPREC_FILTERS, fetch_frame
+
+DEFAULT_PURCHASE_CUTOFF = datetime.datetime(2019, 7, 1)
+
+
+def _placeholders(values):
+    return ", ".join("?" for _ in values)
+
+
+def one_year_before(moment):
+    # Same as DATEADD(YEAR, -1, ...): Feb 29 becomes Feb 28
+    try:
+        return moment.replace(year=moment.year - 1)
+    except ValueError:
+        return moment.replace(year=moment.year - 1, day=28)
+
+
+def auto_reorder_by_location(loc_keys, now):
+    """Distinct ItemIDs not on auto reorder, per LocKey."""
+    since = one_year_before(now)
+    sql = f"""
+    SELECT IL.LocKey AS LocKey, COUNT(DISTINCT [ItemID]) AS item_ids_count
+    {AUTO_REORDER_FROM}
+    WHERE{AUTO_REORDER_FILTERS}
+        AND IL.LocKey IN ({_placeholders(loc_keys)})
+        AND LastSaleDt >= ? AND LastPurchDt >= ?
+    GROUP BY IL.LocKey"""
+    return sql, (*loc_keys, since, since)
+
+
+def auto_reorder_total(loc_keys, now):
+    """Distinct ItemIDs across all requested LocKeys (an item can be at several)."""
+    since = one_year_before(now)
+    sql = f"""
+    SELECT COUNT(DISTINCT [ItemID]) AS item_ids_count
+    {AUTO_REORDER_FROM}
+    WHERE{AUTO_REORDER_FILTERS}
+        AND IL.LocKey IN ({_placeholders(loc_keys)})
+        AND LastSaleDt >= ? AND LastPurchDt >= ?"""
+    return sql, (*loc_keys, since, since)
+
+
+def _serials_at(loc_keys):
+    # ItemBkt_Exp has no LocKey, so serials are tied to the requested LocKeys
+    # through their item, the same Item -> ItemBkt -> ItemLocation join as above
+    return f"""
+      and [Item_ID] IN (
+        SELECT Item.ItemID FROM [dbname].[Item]
+        JOIN dbname.ItemBkt IB ON Item.ItemKey = IB.ItemKey
+        JOIN dbname.ItemLocation IL ON IB.ItemBktKey = IL.ItemBktKey
+        WHERE IL.LocKey IN ({_placeholders(loc_keys)}))"""
+
+
+def ser_not_deprec_by_location(loc_keys, purchased_since):
+    """Distinct serials not depreciating, per SerialNumbers_Location, for items at the LocKeys."""
+    sql = f"""
+    SELECT SerialNumbers_Location AS Location,
+        COUNT(DISTINCT CAST([SerialNumbers_SerialNumber] AS varchar)) AS serial_num_count
+    FROM [dbname].[ItemBkt_Exp]
+    WHERE{SER_NOT_DEPREC_FILTERS}
+      and SerialNumbers_PurchaseDate >= ?{_serials_at(loc_keys)}
+    GROUP BY SerialNumbers_Location"""
+    return sql, (purchased_since, *loc_keys)
+
+
+def ser_not_deprec_total(loc_keys, purchased_since):
+    sql = f"""
+    SELECT COUNT(DISTINCT CAST([SerialNumbers_SerialNumber] AS varchar)) AS serial_num_count
+    FROM [dbname].[ItemBkt_Exp]
+    WHERE{SER_NOT_DEPREC_FILTERS}
+      and SerialNumbers_PurchaseDate >= ?{_serials_at(loc_keys)}"""
+    return sql, (purchased_since, *loc_keys)
+
+
+class ConnectionPool:
+    """At most `size` open connections from `connect()`, each used by one thread at a time."""
+
+    def __init__(self, connect, size=4):
+        self.connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self.connect()
+                with self._lock:
+                    self._all.append(conn)
+            broken = False
+            try:
+                yield conn
+            except Exception:
+                broken = True
+                raise
+            finally:
+                if broken:
+                    self._discard(conn)
+                else:
+                    self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass  # connection already gone
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._idle = queue.LifoQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResultCache:
+    """Query results kept for `ttl` seconds, in memory and (with `directory`) on disk.
+
+    The disk copy is what lets separate dashboard refresh runs share results.
+    """
+
+    def __init__(self, ttl=300, directory=None):
+        self.ttl = ttl
+        self.directory = directory
+        self.memory = {}
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(sql, params):
+        text = json.dumps([sql, [str(p) for p in params]])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".parquet")
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            hit = self.memory.get(key)
+        if hit and now - hit[0] < self.ttl:
+            return hit[1]
+        if self.directory and os.path.exists(self._path(key)):
+            if now - os.path.getmtime(self._path(key)) < self.ttl:
+                df = pd.read_parquet(self._path(key))
+                with self.lock:
+                    self.memory[key] = (os.path.getmtime(self._path(key)), df)
+                return df
+        return None
+
+    def put(self, key, df):
+        with self.lock:
+            self.memory[key] = (time.time(), df)
+        if self.directory:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(fd)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, self._path(key))
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".parquet"):
+                    os.remove(os.path.join(self.directory, name))
+
+
+class LocationMetrics:
+    """Runs the per-location queries concurrently over a ConnectionPool, through a ResultCache."""
+
+    def __init__(self, connect, pool_size=3, ttl=300, cache_dir=None):
+        self.pool = ConnectionPool(connect, pool_size)
+        self.cache = ResultCache(ttl, cache_dir)
+        self.pool_size = pool_size
+        self.hits = 0
+        self.misses = 0
+
+    def query(self, sql, params=()):
+        key = ResultCache.key(sql, params)
+        df = self.cache.get(key)
+        if df is not None:
+            self.hits += 1
+            return df
+        self.misses += 1
+        with self.pool.connection() as conn:
+            df = fetch_frame(conn, sql, params)
+        self.cache.put(key, df)
+        return df
+
+    def run(self, queries):
+        """{name: (sql, params)} -> {name: DataFrame}, independent queries in parallel."""
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            futures = {name: executor.submit(self.query, sql, params) for name, (sql, params) in queries.items()}
+            return {name: f.result() for name, f in futures.items()}
+
+    def metrics(self, loc_keys, purchased_since=DEFAULT_PURCHASE_CUTOFF, now=None):
+        """Per-LocKey item counts, per-location serial counts and the distinct totals.
+
+        Both the item and the serial counts only cover the requested LocKeys.
+
+        `now` defaults to the current hour, so cached results are shared
+        by every refresh within it.
+        """
+        loc_keys = sorted(set(loc_keys))
+        now = now or datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+        results = self.run({
+            "by_lockey": auto_reorder_by_location(loc_keys, now),
+            "total": auto_reorder_total(loc_keys, now),
+            "by_location": ser_not_deprec_by_location(loc_keys, purchased_since),
+            "serial_total": ser_not_deprec_total(loc_keys, purchased_since),
+        })
+        # Every requested LocKey gets a row, zero when nothing qualified there
+        by_lockey = (pd.DataFrame({"LocKey": loc_keys})
+                     .merge(results["by_lockey"], on="LocKey", how="left")
+                     .fillna({"item_ids_count": 0})
+                     .astype({"item_ids_count": int}))
+        return {
+            "item_ids_by_lockey": by_lockey,
+            "item_ids_count": int(results["total"]["item_ids_count"].iloc[0]),
+            "serials_by_location": results["by_location"],
+            "serial_num_count": int(results["serial_total"]["serial_num_count"].iloc[0]),
+        }
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exact run expectancy from the base-out Markov chain.
+
+The 24 base-out states plus "inning over" form an absorbing Markov chain
+once we know P(play type | state) (monte_carlo.TransitionModel) and what
+each play does (state_engine's tables). Expected runs come from one linear
+solve, (I - Q) E = r, and the full distribution of runs to the end of the
+inning comes from one small solve per run total. No random numbers needed.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from portfolio.monte_carlo import TransitionModel
+from portfolio.state_engine import INNING_OVER, N_STATES, NEXT_STATE, RUNS
+
+BASE_LABELS = ["___", "1__", "_2_", "12_", "__3", "1_3", "_23", "123"]
+
+
+class RunExpectancy:
+    """Solved chain: expected runs and run distributions for every state."""
+
+    def __init__(self, expected, distribution):
+        self.expected = expected  # shape (24,)
+        self.distribution = distribution  # shape (24, max_runs + 1), P(exactly k runs)
+
+    def re24(self):
+        """Classic RE24 table: rows are base states, columns are outs."""
+        return pd.DataFrame(self.expected.reshape(3, 8).T, index=BASE_LABELS, columns=[0, 1, 2]).rename_axis(
+            index="bases", columns="outs")
+
+    def scoring_probability(self, at_least=1):
+        """P(scoring at least `at_least` runs) from each state, as an RE24-shaped table."""
+        p = 1 - self.distribution[:, :at_least].sum(axis=1)
+        return pd.DataFrame(p.reshape(3, 8).T, index=BASE_LABELS, columns=[0, 1, 2]).rename_axis(
+            index="bases", columns="outs")
+
+    def run_distribution(self, state=0):
+        return pd.Series(self.distribution[state]).rename_axis("runs")
+
+
+def solve(model, max_runs=30):
+    """Solve the chain for a TransitionModel. Takes a few milliseconds."""
+    # One entry per (state, play type)
+    prob = model.play_probs.ravel()
+    rows = np.repeat(np.arange(N_STATES), model.play_probs.shape[1])
+    runs = RUNS.ravel().astype(np.int64)
+    nxt = NEXT_STATE.ravel().astype(np.int64)
+    over = INNING_OVER.ravel()
+    stay = ~over
+
+    # Expected runs: E = r + Q E  ->  (I - Q) E = r
+    Q = np.zeros((N_STATES, N_STATES))
+    np.add.at(Q, (rows[stay], nxt[stay]), prob[stay])
+    r = np.bincount(rows, weights=prob * runs, minlength=N_STATES)
+    expected = np.linalg.solve(np.eye(N_STATES) - Q, r)
+
+    # Distribution: f[s, k] = sum over plays of p * (over ? [r == k] : f[s', k - r]).
+    # Zero-run moves between live states are the only ones that don't lower k,
+    # so each k is one solve with (I - Q0), using already-known f[:, < k].
+    Q0 = np.zeros((N_STATES, N_STATES))
+    zero = stay & (runs == 0)
+    np.add.at(Q0, (rows[zero], nxt[zero]), prob[zero])
+    A = np.eye(N_STATES) - Q0
+    scoring = stay & (runs > 0)
+
+    dist = np.zeros((N_STATES, max_runs + 1))
+    for k in range(max_runs + 1):
+        ends = over & (runs == k)
+        b = np.bincount(rows[ends], weights=prob[ends], minlength=N_STATES).astype(float)
+        moves = scoring & (runs <= k)
+        if moves.any():
+            b += np.bincount(rows[moves], weights=prob[moves] * dist[nxt[moves], k - runs[moves]],
+                             minlength=N_STATES)
+        dist[:, k] = np.linalg.solve(A, b)
+    return RunExpectancy(expected, dist)
+
+
+class ChainCache:
+    """Solved chains keyed by (team, season).
+
+    Kept in memory, and also written as .npz files when `directory` is set
+    so a dashboard process can load them without re-solving.
+    """
+
+    def __init__(self, directory=None, max_runs=30):
+        self.directory = directory
+        self.max_runs = max_runs
+        self.solved = {}
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, team, season):
+        safe = "".join(c if c.isalnum() else "_" for c in f"{team}_{season}")
+        return os.path.join(self.directory, safe + ".npz")
+
+    def get(self, team, season, plays=None):
+        """Cached RunExpectancy for (team, season), solving from `plays` if needed."""
+        key = (team, season)
+        with self.lock:
+            if key in self.solved:
+                return self.solved[key]
+        if self.directory and os.path.exists(self._path(team, season)):
+            with np.load(self._path(team, season)) as f:
+                result = RunExpectancy(f["expected"], f["distribution"])
+        elif plays is None:
+            raise KeyError(f"No solved chain for {team} {season} and no plays to solve it from")
+        else:
+            result = solve(TransitionModel.from_plays(plays), self.max_runs)
+            if self.directory:
+                np.savez(self._path(team, season), expected=result.expected, distribution=result.distribution)
+        with self.lock:
+            self.solved[key] = result
+        return result
+
+    def invalidate(self, team, season):
+        with self.lock:
+            self.solved.pop((team, season), None)
+        if self.directory and os.path.exists(self._path(team, season)):
+            os.remove(self._path(team, season))
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo game simulation on top of the scraped play-by-play.
+
+TransitionModel estimates, for each of the 24 base-out states, how likely
+each play type is, from the `begin_mc` frame BeginningMonteCarlo.py builds.
+Plays are pushed through state_engine's NEXT_STATE / RUNS / INNING_OVER
+tables, so the simulator moves runners exactly like the scraped data does.
+
+Simulator advances thousands of innings in lockstep as NumPy arrays: every
+step draws one play for each inning still in progress, then drops the
+innings that just ended.
+"""
+
+import ast
+
+import numpy as np
+import pandas as pd
+
+from portfolio.state_engine import INNING_OVER, N_STATES, NEXT_STATE, PLAY_CODE, PLAY_TYPES, RUNS, encode
+from portfolio.streaming import Estimate, Histogram, WinCounter, Welford, run_until
+
+# Plays that never change the base-out state; they'd only add self-loops
+NON_EVENTS = ["Substitution", "Other"]
+
+
+def _bases_mask(bases):
+    # Bases is a uint8 bitmask now, but older CSVs stored "[1, 0, 0]" lists
+    if pd.api.types.is_integer_dtype(bases):
+        return bases.to_numpy(dtype=np.int64)
+    lists = [ast.literal_eval(b) if isinstance(b, str) else b for b in bases]
+    return np.array([b[0] * 1 + b[1] * 2 + b[2] * 4 for b in lists], dtype=np.int64)
+
+
+def states_before(plays):
+    """Base-out state each play started from.
+
+    That is the state after the previous play, except at the start of a
+    new half inning or game, which always starts empty with no outs. Games
+    are told apart by the Game column; a frame without one is one game.
+    """
+    after = encode(plays["Outs"].to_numpy(dtype=np.int64), _bases_mask(plays["Bases"]))
+    half = plays["Inning"].astype(str) + plays["Half"].astype(str)
+    new_half = half != half.shift()
+    if "Game" in plays.columns:
+        game = plays["Game"].astype(str)
+        new_half |= game != game.shift()
+    before = np.roll(after, 1)
+    before[new_half.to_numpy()] = 0
+    return before
+
+
+class TransitionModel:
+    """Probability of each play type from each base-out state.
+
+    play_probs has shape (24, len(PLAY_TYPES)) and every row sums to 1.
+    """
+
+    def __init__(self, play_probs):
+        self.play_probs = np.asarray(play_probs, dtype=float)
+        cdf = np.cumsum(self.play_probs, axis=1)
+        cdf[:, -1] = 1.0
+        # Offsetting each row by its state index makes one sorted array, so
+        # a single searchsorted samples a play for every trial at once
+        self._flat_cdf = (np.arange(N_STATES)[:, None] + cdf).ravel()
+
+    @classmethod
+    def from_plays(cls, plays, prior=5.0):
+        """Estimate from a begin_mc style frame (Play Type, Outs, Bases, Inning, Half).
+
+        Each state's counts are shrunk toward the all-states play mix with
+        `prior` pseudo-observations, so rarely seen states still get sane
+        probabilities.
+        """
+        before = states_before(plays)
+        codes = plays["Play Type"].astype(str).map(PLAY_CODE).fillna(PLAY_CODE["Other"]).to_numpy(dtype=np.int64)
+        events = ~np.isin(codes, [PLAY_CODE[p] for p in NON_EVENTS])
+
+        counts = np.zeros((N_STATES, len(PLAY_TYPES)))
+        np.add.at(counts, (before[events], codes[events]), 1)
+        overall = counts.sum(axis=0)
+        if overall.sum() == 0:
+            raise ValueError("No plays to estimate transition probabilities from.")
+        overall /= overall.sum()
+
+        probs = counts + prior * overall
+        return cls(probs / probs.sum(axis=1, keepdims=True))
+
+    def transition_probabilities(self):
+        """Frame of P(play type | state) with readable state labels."""
+        index = [f"{s // 8} out, {'1' if s & 1 else '-'}{'2' if s & 2 else '-'}{'3' if s & 4 else '-'}"
+                 for s in range(N_STATES)]
+        return pd.DataFrame(self.play_probs, index=index, columns=PLAY_TYPES)
+
+    def sample(self, states, rng):
+        """Draw one play for each state; returns flat (state, play) table indices."""
+        return np.searchsorted(self._flat_cdf, states + rng.random(len(states)), side="right")
+
+
+_NEXT = NEXT_STATE.ravel().astype(np.int64)
+_RUNS = RUNS.ravel().astype(np.int64)
+_OVER = INNING_OVER.ravel()
+
+
+class GameResults:
+    def __init__(self, home_runs, away_runs, innings):
+        self.home_runs = home_runs
+        self.away_runs = away_runs
+        self.innings = innings
+
+    @property
+    def trials(self):
+        return len(self.home_runs)
+
+    def home_win_probability(self):
+        return float(np.mean(self.home_runs > self.away_runs))
+
+    def away_win_probability(self):
+        return float(np.mean(self.away_runs > self.home_runs))
+
+    def tie_probability(self):
+        # Only left when extra innings hit max_innings
+        return float(np.mean(self.home_runs == self.away_runs))
+
+    def run_distribution(self, side="home"):
+        runs = self.home_runs if side == "home" else self.away_runs
+        return pd.Series(np.bincount(runs) / len(runs)).rename_axis("runs")
+
+    def summary(self):
+        return {
+            "trials": self.trials,
+            "home_win": self.home_win_probability(),
+            "away_win": self.away_win_probability(),
+            "tie": self.tie_probability(),
+            "home_runs_mean": float(self.home_runs.mean()),
+            "away_runs_mean": float(self.away_runs.mean()),
+        }
+
+
+class Simulator:
+    """Seeded, vectorized inning and game simulator."""
+
+    def __init__(self, model, seed=None, max_plays=200):
+        self.model = model
+        self.rng = np.random.default_rng(seed)
+        self.max_plays = max_plays  # safety cap per inning
+
+    def innings(self, n, start_state=0, model=None):
+        """Runs scored in each of `n` simulated innings from `start_state` to three outs."""
+        model = model or self.model
+        runs = np.zeros(n, dtype=np.int64)
+        states = np.full(n, start_state, dtype=np.int64)
+        active = np.arange(n)
+
+        for _ in range(self.max_plays):
+            if not len(active):
+                break
+            idx = model.sample(states, self.rng)
+            runs[active] += _RUNS[idx]
+            over = _OVER[idx]
+            keep = ~over
+            active = active[keep]
+            states = _NEXT[idx][keep]
+        return runs
+
+    def run_distribution(self, n, start_state=0):
+        """P(runs scored in the rest of the inning) from `start_state`."""
+        runs = self.innings(n, start_state)
+        return pd.Series(np.bincount(runs) / n).rename_axis("runs")
+
+    def games(self, n, home=None, away=None, innings=9, max_innings=20):
+        """Simulate `n` games; extra innings are played until untied or max_innings."""
+        home = home or self.model
+        away = away or self.model
+        home_runs = self.innings(n * innings, model=home).reshape(n, innings).sum(axis=1)
+        away_runs = self.innings(n * innings, model=away).reshape(n, innings).sum(axis=1)
+        played = np.full(n, innings)
+
+        for _ in range(innings, max_innings):
+            tied = np.flatnonzero(home_runs == away_runs)
+            if not len(tied):
+                break
+            away_runs[tied] += self.innings(len(tied), model=away)
+            home_runs[tied] += self.innings(len(tied), model=home)
+            played[tied] += 1
+        return GameResults(home_runs, away_runs, played)
+
+    def win_probability(self, n, home=None, away=None):
+        return self.games(n, home, away).home_win_probability()
+
+    # ---- adaptive runs: stream batches into accumulators, stop at the target precision ----
+    def estimate_runs(self, target_width=0.01, start_state=0, confidence=0.95,
+                      batch=100_000, max_trials=10_000_000):
+        """Mean runs to the end of the inning from `start_state`, to +/- target_width / 2."""
+        runs_mean, runs_hist = Welford(), Histogram()
+
+        def step(n):
+            runs = self.innings(n, start_state)
+            runs_mean.update(runs)
+            runs_hist.update(runs)
+
+        run_until(step, runs_mean, target_width, confidence, batch, batch, max_trials)
+        return Estimate("runs", runs_mean, confidence, target_width, {"histogram": runs_hist})
+
+    def estimate_games(self, target_width=0.01, metric="home_win", home=None, away=None,
+                       confidence=0.95, batch=20_000, max_trials=2_000_000):
+        """Simulate games in batches until `metric` is known to within target_width.
+
+        metric is "home_win" (probability), "home_runs", "away_runs" or
+        "run_diff" (means). Every accumulator is filled either way and
+        returned in Estimate.extras.
+        """
+        acc = {"home_win": WinCounter(), "home_runs": Welford(), "away_runs": Welford(), "run_diff": Welford()}
+        hists = {"home": Histogram(), "away": Histogram()}
+
+        def step(n):
+            g = self.games(n, home, away)
+            acc["home_win"].update(g.home_runs, g.away_runs)
+            acc["home_runs"].update(g.home_runs)
+            acc["away_runs"].update(g.away_runs)
+            acc["run_diff"].update(g.home_runs - g.away_runs)
+            hists["home"].update(g.home_runs)
+            hists["away"].update(g.away_runs)
+
+        run_until(step, acc[metric], target_width, confidence, batch, batch, max_trials)
+        return Estimate(metric, acc[metric], confidence, target_width, {**acc, **hists})
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-disk HTML cache that sits under fetch.py.
+
+Pages are stored content-addressed (objects/<sha256>.html) with a JSON index
+mapping each key (usually the URL) to its object plus ETag/Last-Modified,
+fetch time and last access time. Entries younger than `ttl` seconds are
+served without touching the network; older ones are revalidated with a
+conditional GET. When the objects grow past `max_bytes` the least recently
+used entries are evicted. In offline mode only the cache is consulted.
+
+Access times are written back with the index at most every
+`access_save_interval` seconds (and on flush()), so eviction order
+survives a restart without rewriting the index on every cache hit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a page was never cached."""
+
+
+class PageCache:
+    def __init__(self, directory=".page_cache", ttl=24 * 3600, max_bytes=500 * 2**20, offline=False,
+                 access_save_interval=5.0):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.access_save_interval = access_save_interval
+        self._dirty = False
+        self._saved = time.time()
+        self.objects = os.path.join(directory, "objects")
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.RLock()
+        os.makedirs(self.objects, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+
+    # ---- storage ----
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest + ".html")
+
+    def _save_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+        self._saved = time.time()
+
+    def _read(self, entry):
+        with open(self._object_path(entry["sha"]), encoding="utf-8") as f:
+            return f.read()
+
+    def lookup(self, key):
+        """Return (html, entry) for a cached key, or (None, None)."""
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None, None
+            try:
+                html = self._read(entry)
+            except FileNotFoundError:
+                del self.index[key]  # object was removed behind our back
+                self._save_index()
+                return None, None
+            entry["accessed"] = time.time()
+            self._dirty = True
+            if entry["accessed"] - self._saved >= self.access_save_interval:
+                self._save_index()
+            return html, entry
+
+    def flush(self):
+        """Write access times not saved yet to the index."""
+        with self.lock:
+            if self._dirty:
+                self._save_index()
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched"] < self.ttl
+
+    def put(self, key, html, etag=None, last_modified=None):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        with self.lock:
+            if not os.path.exists(path):
+                fd, tmp = tempfile.mkstemp(dir=self.objects)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            now = time.time()
+            self.index[key] = {"sha": digest, "size": len(data), "etag": etag,
+                               "last_modified": last_modified, "fetched": now, "accessed": now}
+            self._evict()
+            self._save_index()
+
+    def touch(self, key):
+        """Mark a revalidated entry as freshly fetched."""
+        with self.lock:
+            self.index[key]["fetched"] = time.time()
+            self._save_index()
+
+    def _evict(self):
+        # Objects are shared between keys with identical content, so size by object
+        sizes = {e["sha"]: e["size"] for e in self.index.values()}
+        total = sum(sizes.values())
+        for key, entry in sorted(self.index.items(), key=lambda kv: kv[1]["accessed"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            if not any(e["sha"] == entry["sha"] for e in self.index.values()):
+                total -= entry["size"]
+                try:
+                    os.remove(self._object_path(entry["sha"]))
+                except FileNotFoundError:
+                    pass
+
+    def size(self):
+        with self.lock:
+            return sum({e["sha"]: e["size"] for e in self.index.values()}.values())
+
+    def clear(self):
+        with self.lock:
+            for name in os.listdir(self.objects):
+                os.remove(os.path.join(self.objects, name))
+            self.index = {}
+            self._save_index()
+
+    # ---- HTTP ----
+    def fetch(self, url, get):
+        """Return (html, status) for `url`, going to the network only if needed.
+
+        `get(url, headers)` must return a requests-style response. status is
+        "fresh" (served from cache), "revalidated" (304 from the server),
+        "fetched" (new or changed content) or "offline".
+        """
+        html, entry = self.lookup(url)
+        if self.offline:
+            if html is None:
+                raise CacheMiss(f"{url} is not in the page cache (offline mode)")
+            return html, "offline"
+        if html is not None and self.is_fresh(entry):
+            return html, "fresh"
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        r = get(url, headers)
+        if r.status_code == 304 and html is not None:
+            self.touch(url)
+            return html, "revalidated"
+        r.raise_for_status()
+        self.put(url, r.text, etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+        return r.text, "fetched"
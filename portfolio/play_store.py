@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar (Parquet) storage for the play-by-play.
+
+Plays are written as a dataset partitioned by season and team
+(plays/season=2025/team=Alvernia/...parquet) with compact dtypes: Play
+Type, Half and Game as dictionary-encoded categoricals, Inning/Outs/Bases
+as uint8 and run columns as small ints. Readers ask for one season, team or
+inning range and pyarrow only opens the matching partitions and row groups.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from portfolio.monte_carlo import _bases_mask
+from portfolio.state_engine import PLAY_TYPES
+
+HALVES = ["Top", "Bottom"]
+
+# Column -> dtype for everything we know about; other columns pass through
+PLAY_DTYPES = {
+    "Game": "category",
+    "Inning": "uint8",
+    "Half": pd.CategoricalDtype(HALVES),
+    "Play Type": pd.CategoricalDtype(PLAY_TYPES),
+    "Outs": "uint8",
+    "Bases": "uint8",
+    "Runs": "int16",
+    "Runs_On_Play": "int8",
+    "Runs_In_Inning": "int8",
+}
+
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.int16()), ("team", pa.string())]), flavor="hive")
+
+
+def compact_plays(df):
+    """Same frame with the small dtypes above (Bases lists from old CSVs become bitmasks)."""
+    df = df.copy()
+    if "Bases" in df.columns:
+        df["Bases"] = _bases_mask(df["Bases"])
+    for col, dtype in PLAY_DTYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    if "Play Description" in df.columns:
+        df["Play Description"] = df["Play Description"].astype("string")
+    return df
+
+
+def write_plays(df, root, season, team, row_group_size=50_000):
+    """Write (replace) one team-season partition under `root`."""
+    df = compact_plays(df)
+    df["season"] = np.int16(season)
+    df["team"] = team
+    # Rows stay in play order (the simulator needs it). min_rows_per_group
+    # matters: without it the writer flushes one tiny row group per batch
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    options = ds.ParquetFileFormat().make_write_options(compression="zstd", compression_level=9)
+    ds.write_dataset(table, root, format="parquet", partitioning=PARTITIONING, file_options=options,
+                     existing_data_behavior="delete_matching",
+                     min_rows_per_group=row_group_size, max_rows_per_group=row_group_size,
+                     basename_template="part-{i}.parquet")
+    return root
+
+
+def plays_filter(season=None, team=None, innings=None):
+    """pyarrow filter expression; `season`/`team` may be a value or a list, `innings` a (lo, hi) pair."""
+    conditions = []
+    for name, value in (("season", season), ("team", team)):
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        conditions.append(ds.field(name).isin(list(values)))
+    if innings is not None:
+        lo, hi = innings
+        conditions.append((ds.field("Inning") >= lo) & (ds.field("Inning") <= hi))
+    expr = None
+    for c in conditions:
+        expr = c if expr is None else expr & c
+    return expr
+
+
+def read_plays(root, season=None, team=None, innings=None, columns=None):
+    """Load plays with partition and row-group pruning; returns a compact frame."""
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=plays_filter(season, team, innings))
+    return compact_plays(table.to_pandas())
+
+
+def partitions(root):
+    """Every (season, team) stored under `root`."""
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    table = dataset.to_table(columns=["season", "team"])
+    return sorted(set(zip(table["season"].to_pylist(), table["team"].to_pylist())))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 24 15:11:54 2025
+
+@author: tholcomb
+
+Play-by-play processing: half-inning tables -> one game -> classified plays
+with outs, bases and runs. Only pandas and NumPy, so workers can import it
+without pulling in the scraping stack.
+"""
+
+import numpy as np
+import pandas as pd
+
+from portfolio.instrument import stage
+from portfolio.play_classifier import classify_plays
+from portfolio.state_engine import run_states
+
+
+# ---- Combine half-inning tables into one game ----
+def combine_innings(tables):
+    play_tables = []
+    for t in tables:
+        if not isinstance(t, pd.DataFrame):
+            continue
+        # Check if it has a 'Play Description' column
+        if any("Play Description" in str(col) for col in t.columns) and not any("Logo" in str(col) for col in t.columns):
+            # Skip empty or duplicate tables
+            if t.dropna(how="all").empty:
+                break  # Stop once the first empty table appears
+            play_tables.append(t)
+    # Safety check
+    if not play_tables:
+        raise ValueError("No play-by-play tables found.")
+    # Combine with inning/half tags
+    combined = []
+    for i, t in enumerate(play_tables, start=1):
+        t = t.copy()
+        t["Inning"] = (i + 1) // 2
+        t["Half"] = "Top" if i % 2 != 0 else "Bottom"
+        combined.append(t)
+    df = pd.concat(combined, ignore_index=True)
+    # Remove exact duplicate rows if the site repeated text blocks
+    df = df.drop_duplicates(subset=df.columns, keep="first").reset_index(drop=True)
+    return df
+
+def parse_play(desc):
+    desc = str(desc).lower()
+
+    # Skip substitutions and pitching changes
+    if any(x in desc for x in ["to p for", "pinch hit", "pinch ran", "to 1b for", "to ss for", "to 2b for", "to c for", "to lf for", "to rf for", "to cf for", "to 3b for"]):
+        return "Substitution"
+
+    # Basic outcomes
+    if "walked" in desc:
+        return "Walk"
+    if "hit by pitch" in desc:
+        return "Hit by Pitch"
+    if "singled" in desc:
+        return "Single"
+    if "doubled" in desc:
+        return "Double"
+    if "tripled" in desc:
+        return "Triple"
+    if "homered" in desc:
+        return "Home Run"
+    if "struck out" in desc:
+        return "Strikeout"
+
+    # Outs
+    if any(x in desc for x in ["grounded out", "flied out", "lined out", "popped up"]):
+        return "Out"
+
+    # Fielding events
+    if "fielder's choice" in desc:
+        return "Fielder's Choice"
+    if "reached on a fielder's choice" in desc:
+        return "Fielder's Choice"
+    if "reached on a fielding error" in desc or "reached on a throwing error" in desc:
+        return "Error"
+
+    # Runner movements
+    if "stole" in desc:
+        return "Stolen Base"
+    if "caught stealing" in desc:
+        return "Caught Stealing"
+
+    # Sacrifices
+    if "sacrifice fly" in desc or "sac fly" in desc:
+        return "Sacrifice Fly"
+    if "sac bunt" in desc or "sacrifice bunt" in desc:
+        return "Sacrifice Bunt"
+
+    # Pitches/wild
+    if "wild pitch" in desc:
+        return "Wild Pitch"
+    if "passed ball" in desc:
+        return "Passed Ball"
+    if "balk" in desc:
+        return "Balk"
+    if "double play" in desc:
+        return "Double Play"
+    if "triple play" in desc:
+        return "Triple Play"
+
+
+    # Everything else
+    return "Other"
+
+def update_state(play, state, desc=None):
+    state = state.copy()
+
+    # Base/Out reset logic
+    if play == "Substitution":
+        return state
+
+    # --- Outs ---
+    if play in ["Out", "Strikeout", "Sacrifice Fly", "Sacrifice Bunt"]:
+        state["outs"] += 1
+
+    elif play == "Double Play":
+        state["outs"] += 2
+        # assume lead runner erased if anyone on base
+        if any(state["bases"]):
+            # remove the lead runner
+            for i in range(2, -1, -1):
+                if state["bases"][i] == 1:
+                    state["bases"][i] = 0
+                    break
+
+    elif play == "Triple Play":
+        state["outs"] += 3
+
+    # --- Walk / HBP ---
+    elif play in ["Walk", "Hit by Pitch"]:
+        if all(state["bases"]):
+            state["runs"] += 1
+        state["bases"] = [1] + state["bases"][:-1]
+
+    # --- Single ---
+    elif play == "Single":
+        runs_scored = 0
+        if state["bases"][2]:
+            runs_scored += 1
+        state["bases"] = [1, state["bases"][0], state["bases"][1]]
+        state["runs"] += runs_scored
+
+    # --- Double ---
+    elif play == "Double":
+        runs_scored = 0
+        # more precise: read description for 'RBI' count
+        if desc and "rbi" in desc.lower():
+            import re
+            rbi_match = re.search(r"(\d+) rbi", desc.lower())
+            if rbi_match:
+                runs_scored = int(rbi_match.group(1))
+        else:
+            runs_scored = state["bases"][2] + state["bases"][1]
+        state["runs"] += runs_scored
+        # shift bases logically: batter to 2nd, runner on 1st to 3rd if empty
+        state["bases"] = [0, 1, state["bases"][0]]
+
+    # --- Triple ---
+    elif play == "Triple":
+        runs_scored = sum(state["bases"])
+        state["runs"] += runs_scored
+        state["bases"] = [0, 0, 1]
+
+    # --- Home Run ---
+    elif play == "Home Run":
+        state["runs"] += sum(state["bases"]) + 1
+        state["bases"] = [0, 0, 0]
+
+    # --- Fielder's Choice or Error ---
+    elif play in ["Error", "Fielder's Choice"]:
+        # approximate: runner reaches first, lead runner out if bases occupied
+        if any(state["bases"]):
+            state["outs"] += 1
+            for i in range(2, -1, -1):
+                if state["bases"][i] == 1:
+                    state["bases"][i] = 0
+                    break
+        state["bases"] = [1] + state["bases"][:-1]
+
+    # --- Stolen Base ---
+    elif play == "Stolen Base":
+        # move one runner forward if possible
+        for i in range(2, -1, -1):
+            if state["bases"][i] == 1:
+                if i < 2:
+                    state["bases"][i] = 0
+                    state["bases"][i+1] = 1
+                else:
+                    state["bases"][i] = 0
+                    state["runs"] += 1
+                break
+
+    # --- Caught Stealing ---
+    elif play == "Caught Stealing":
+        state["outs"] += 1
+
+    # --- Wild Pitch / Passed Ball / Balk ---
+    elif play in ["Wild Pitch", "Passed Ball", "Balk"]:
+        runs_scored = 0
+        if state["bases"][2]:
+            runs_scored += 1
+        state["bases"] = [0] + state["bases"][:-1]
+        state["runs"] += runs_scored
+
+    # --- Inning end reset ---
+    if state["outs"] >= 3:
+        state = {"outs": 0, "bases": [0, 0, 0], "runs": state["runs"]}
+
+    return state
+
+
+def process_games(games, keys=None):
+    """Classify plays and track outs/bases/runs for many games in one pass.
+
+    Same columns as process_game, but Bases is a uint8 bitmask
+    (1 = first, 2 = second, 4 = third) and the state machine runs on
+    integer tables from state_engine instead of dict copies per row.
+    With `keys` (one per game), a Game column says which game each row is from.
+    """
+    if keys is not None:
+        games = [g.assign(Game=k) for g, k in zip(games, keys)]
+    played = [g for g in games if len(g)]
+    if played:
+        df = pd.concat(played)
+    else:
+        # No plays at all: keep the input's columns (or combine_innings') and add the processed ones empty
+        df = games[0].copy() if games else pd.DataFrame({c: pd.Series(dtype=object)
+                                                         for c in ("Play Description", "Inning", "Half")})
+    game_starts = np.zeros(len(df), dtype=bool)
+    if played:
+        game_starts[np.cumsum([0] + [len(g) for g in played[:-1]])] = True
+
+    df["Play Type"] = classify_plays(df["Play Description"])
+    outs, bases, runs = run_states(df["Play Type"].cat.codes.to_numpy(), game_starts, df["Play Description"].to_numpy())
+    df["Outs"] = outs
+    df["Bases"] = bases
+    df["Runs"] = runs
+    return df
+
+
+def process_game(df):
+    return process_games([df])
+
+
+def season_rows(df):
+    """Keep the Monte Carlo columns and add per-play / per-inning runs.
+
+    Runs restart with every game, so with a Game column the diffs and
+    cumsums are taken per game; without one, df is a single game.
+    """
+    keep = ["Game", "Play Description", "Inning", "Half", "Play Type", "Outs", "Bases", "Runs"]
+    rows = df[[c for c in keep if c in df.columns]].reset_index(drop=True)
+    game = rows["Game"] if "Game" in rows.columns else pd.Series(0, index=rows.index)
+    # Runs is cumulative within the game, so the first play's diff is its own total
+    rows["Runs_On_Play"] = rows.groupby(game)["Runs"].diff().fillna(rows["Runs"]).astype(int)
+    rows["Runs_In_Inning"] = rows.groupby([game, rows["Inning"], rows["Half"]])["Runs_On_Play"].cumsum()
+    return rows
+
+
+def process_rows(raw):
+    # One scraped game -> the rows SeasonStore keeps for it
+    with stage("process_game") as s:
+        rows = season_rows(process_game(raw))
+        s.rows = len(rows)
+    return rows
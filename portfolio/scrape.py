@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Sep  3 15:17:57 2025
+
+@author: tholcomb
+
+Conference and team stats scraping, one page at a time or in batches from
+a config file with a resumable job queue. The cleaned tables are written as
+CSVs under out_dir and, when an engine is given, upserted into the database.
+"""
+
+import json
+import os
+import re
+
+import pandas as pd
+
+from portfolio.crawler import crawl
+from portfolio.fetch import fetch_tables
+from portfolio.instrument import stage
+from portfolio.job_queue import DONE, JobQueue
+from portfolio.stats_schema import clean_conference_stats, clean_team_stats
+from portfolio.table_extract import TableExtractor, TableSignature
+
+# The tables each page should have, found by header row instead of position
+CONFERENCE_TABLES = TableExtractor(
+    TableSignature("standings", headers=["Tm", "W", "L"], exclude=["ERA", "BA"]),
+    TableSignature("batting", headers=["Tm", "BA", "OBP", "SLG"]),
+    TableSignature("pitching", headers=["Tm", "ERA", "WHIP"]),
+)
+TEAM_TABLES = TableExtractor(
+    TableSignature("individual_batting", headers=["Player", "AVG", "GP-GS", "AB"]),
+    TableSignature("individual_pitching", headers=["Player", "ERA", "APP-GS", "IP"]),
+    TableSignature("individual_fielding", headers=["Player", "PO", "FLD%"]),
+    TableSignature("game_batting", headers=["Date", "Opponent", "AB"]),
+    TableSignature("game_pitching", headers=["Date", "Opponent", "IP"]),
+)
+
+
+def scrape_conferences(conference_url, conference_name):
+    # Static HTML first, headless Chrome only if the three tables aren't there.
+    # HTTP, network and TableNotFound errors propagate: the crawler retries the
+    # transient ones and the job queue records the real cause
+    with stage("scrape_conference", item=conference_url):
+        result = fetch_tables(conference_url, ready=CONFERENCE_TABLES.ready, parse=CONFERENCE_TABLES)
+        tables = CONFERENCE_TABLES.require(result.tables, conference_url)
+    standings = tables["standings"]
+    batting = tables["batting"]
+    pitching = tables["pitching"]
+
+    # Add conference column
+    standings["Conference"] = conference_name
+    batting["Conference"] = conference_name
+    pitching["Conference"] = conference_name
+
+    return standings, batting, pitching
+
+
+def scrape_teams(team_url, team_name):
+    # Only the five tables we use are parsed; the page has plenty more
+    with stage("scrape_team", item=team_url):
+        result = fetch_tables(team_url, ready=TEAM_TABLES.ready, parse=TEAM_TABLES)
+        tables = TEAM_TABLES.require(result.tables, team_url)
+
+    individual_batting = tables["individual_batting"]
+    individual_pitching = tables["individual_pitching"]
+    individual_fielding = tables["individual_fielding"]
+    game_batting = tables["game_batting"]
+    game_pitching = tables["game_pitching"]
+
+    return individual_batting, individual_pitching, individual_fielding, game_batting, game_pitching
+
+
+# ---- Batch mode: every conference and team in a config file ----
+def load_config(path):
+    """{"season_year": 2025, "conferences": [{"name": ..., "url": ...}], "teams": [...]}"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("season_year", 2025)
+    config.setdefault("conferences", [])
+    config.setdefault("teams", [])
+    return config
+
+
+def entity_folder(out_dir, kind, name):
+    return os.path.join(out_dir, kind, re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_"))
+
+
+def write_entity(out_dir, kind, name, frames):
+    """Write one finished conference/team as out_dir/<kind>/<name>/<table>.csv."""
+    folder = entity_folder(out_dir, kind, name)
+    os.makedirs(folder, exist_ok=True)
+    for table, df in frames.items():
+        df.to_csv(os.path.join(folder, table + ".csv"), index=False)
+    return folder
+
+
+def conference_job(job, out_dir, engine=None):
+    standings, batting, pitching = scrape_conferences(job["url"], job["name"])
+    batting, pitching, standings = clean_conference_stats(batting, pitching, standings, job["season_year"])
+    frames = {"conference_standings": standings, "conference_batting": batting, "conference_pitching": pitching}
+    with stage("write_csv"):
+        write_entity(out_dir, "conferences", job["name"], frames)
+    if engine is not None:
+        from portfolio.sql_loader import load_scrape  # SQLAlchemy only when there's a database
+        load_scrape(engine, frames)
+    return {name: len(df) for name, df in frames.items()}
+
+
+def team_job(job, out_dir, engine=None):
+    individual_batting, individual_pitching, individual_fielding, game_batting, game_pitching = scrape_teams(job["url"], job["name"])
+    individual_batting, individual_pitching, individual_fielding = clean_team_stats(individual_batting, individual_pitching, individual_fielding,
+                                                                                 job["season_year"])
+    frames = {"player_batting": individual_batting, "player_pitching": individual_pitching,
+              "player_fielding": individual_fielding}
+    with stage("write_csv"):
+        write_entity(out_dir, "teams", job["name"], {**frames, "game_batting": game_batting, "game_pitching": game_pitching})
+    if engine is not None:
+        from portfolio.sql_loader import load_scrape
+        load_scrape(engine, frames, team=job["name"])
+    return {name: len(df) for name, df in frames.items()}
+
+
+BATCH_JOBS = {"conference": conference_job, "team": team_job}
+
+# Tables each job writes that the database has a schema for
+JOB_TABLES = {
+    "conference": ("conference_standings", "conference_batting", "conference_pitching"),
+    "team": ("player_batting", "player_pitching", "player_fielding"),
+}
+
+
+def run_batch(config_path, out_dir="scrape_output", workers=4, engine=None, retry_failed=True):
+    """Scrape, clean and write every entity in the config, resuming from out_dir/jobs.json.
+
+    Jobs already done in an earlier (possibly crashed) run are skipped; each
+    entity's CSVs (and database rows, if `engine` is given) are written as
+    soon as it finishes. Concurrency is bounded by `workers` and, per host,
+    by the polite rates fetch applies to network requests.
+    """
+    config = load_config(config_path)
+    queue = JobQueue(os.path.join(out_dir, "jobs.json"))
+    for kind, entries in (("conference", config["conferences"]), ("team", config["teams"])):
+        for entry in entries:
+            queue.add(entry["url"], kind=kind, name=entry["name"], url=entry["url"],
+                      season_year=entry.get("season_year", config["season_year"]))
+
+    todo = queue.pending(retry_failed)
+    print(f"{len(todo)} of {len(queue.jobs)} jobs to run ({queue.counts()['done']} already done)")
+
+    def work(url):
+        job = queue.start(url)
+        try:
+            with stage(job["kind"] + "_job", item=url):
+                result = BATCH_JOBS[job["kind"]](job, out_dir, engine)
+        except Exception as e:
+            queue.fail(url, e)
+            raise
+        queue.done(url, result)
+        return result
+
+    report = crawl(todo, work, workers=workers)
+    report.print_summary()
+    print(queue.counts())
+    return report
+
+
+def load_output(out_dir, engine):
+    """Upsert the CSVs of every finished job in out_dir/jobs.json into the database.
+
+    Returns {job name: LoadReport}. Loading is idempotent, so re-running it
+    after a partial failure just updates the rows already there.
+    """
+    from portfolio.sql_loader import load_scrape
+
+    queue = JobQueue(os.path.join(out_dir, "jobs.json"))
+    reports = {}
+    for job in queue.jobs.values():
+        if job["status"] != DONE:
+            continue
+        kind = job["kind"]
+        folder = entity_folder(out_dir, kind + "s", job["name"])
+        frames = {table: pd.read_csv(os.path.join(folder, table + ".csv")) for table in JOB_TABLES[kind]
+                  if os.path.exists(os.path.join(folder, table + ".csv"))}
+        reports[job["name"]] = load_scrape(engine, frames, team=job["name"] if kind == "team" else None)
+        reports[job["name"]].print_summary()
+    return reports
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conference season simulation across every core.
+
+Starting from the `standings` frame clean_conference_stats returns, each
+team gets a regressed win probability, every pairing gets a log5 matchup
+probability, and whole round-robin schedules are played out tens of
+thousands of times. The matchup table goes into shared memory once; each
+worker process attaches to it and simulates its own chunk of seasons with
+an independent seed, sending back only small count arrays that are summed
+into per-team win, finish and playoff distributions.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+def team_strengths(standings, prior_games=10):
+    """Win probability per team from W/L, regressed toward .500 by `prior_games`."""
+    team_col = "team" if "team" in standings.columns else "tm"
+    wins_col = "wins" if "wins" in standings.columns else "w"
+    losses_col = "losses" if "losses" in standings.columns else "l"
+
+    wins = pd.to_numeric(standings[wins_col], errors="coerce").fillna(0)
+    losses = pd.to_numeric(standings[losses_col], errors="coerce").fillna(0)
+    ties = pd.to_numeric(standings["ties"], errors="coerce").fillna(0) if "ties" in standings.columns else 0
+    pct = (wins + 0.5 * ties + prior_games / 2) / (wins + losses + ties + prior_games)
+    return pd.Series(pct.to_numpy(), index=standings[team_col].astype(str).to_numpy(), name="strength")
+
+
+def matchup_matrix(strength, home_edge=0.0):
+    """P[i, j] = probability team i beats team j at home (log5, plus an optional home edge)."""
+    p = np.clip(np.asarray(strength, dtype=float), 1e-6, 1 - 1e-6)
+    a, b = p[:, None], p[None, :]
+    log5 = (a - a * b) / (a + b - 2 * a * b)
+    odds = log5 / (1 - log5) * np.exp(home_edge)
+    matrix = odds / (1 + odds)
+    np.fill_diagonal(matrix, 0.5)
+    return matrix
+
+
+def round_robin(n_teams, games_per_pair=2):
+    """Home and away team index for every game, each pair splitting home games."""
+    i, j = np.triu_indices(n_teams, k=1)
+    home = np.concatenate([i if g % 2 == 0 else j for g in range(games_per_pair)])
+    away = np.concatenate([j if g % 2 == 0 else i for g in range(games_per_pair)])
+    return home, away
+
+
+# ---- worker side ----
+_shared = {}
+
+
+def _attach(name, n_teams):
+    # Workers only attach; the parent created the block and unlinks it when done
+    shm = shared_memory.SharedMemory(name=name)
+    _shared["shm"] = shm
+    _shared["matrix"] = np.ndarray((n_teams, n_teams), dtype=np.float64, buffer=shm.buf)
+
+
+def _simulate_chunk(n_seasons, home, away, playoff_spots, seed, batch=2000):
+    matrix = _shared["matrix"]
+    n_teams = matrix.shape[0]
+    n_games = len(home)
+    rng = np.random.default_rng(seed)
+    p_home = matrix[home, away]
+
+    # Incidence matrices turn per-game results into per-team win totals with one matmul
+    home_onehot = np.zeros((n_games, n_teams))
+    home_onehot[np.arange(n_games), home] = 1
+    away_onehot = np.zeros((n_games, n_teams))
+    away_onehot[np.arange(n_games), away] = 1
+
+    win_counts = np.zeros((n_teams, n_games + 1), dtype=np.int64)
+    finish_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    playoff_counts = np.zeros(n_teams, dtype=np.int64)
+
+    done = 0
+    while done < n_seasons:
+        size = min(batch, n_seasons - done)
+        home_won = rng.random((size, n_games)) < p_home
+        wins = (home_won @ home_onehot + (~home_won) @ away_onehot).astype(np.int64)
+
+        # Rank by wins, random tiebreak
+        order = np.argsort(-(wins + rng.random(wins.shape) * 0.5), axis=1)
+        place = np.empty_like(order)
+        place[np.arange(size)[:, None], order] = np.arange(n_teams)
+
+        teams = np.broadcast_to(np.arange(n_teams), wins.shape)
+        np.add.at(win_counts, (teams, wins), 1)
+        np.add.at(finish_counts, (teams, place), 1)
+        playoff_counts += (place < playoff_spots).sum(axis=0)
+        done += size
+    return win_counts, finish_counts, playoff_counts
+
+
+class SeasonResults:
+    def __init__(self, teams, n_seasons, win_counts, finish_counts, playoff_counts, seconds):
+        self.teams = list(teams)
+        self.n_seasons = n_seasons
+        self.win_counts = win_counts
+        self.finish_counts = finish_counts
+        self.playoff_counts = playoff_counts
+        self.seconds = seconds
+
+    def win_distribution(self):
+        """P(team finishes with exactly k wins); rows are teams, columns k."""
+        return pd.DataFrame(self.win_counts / self.n_seasons, index=self.teams).rename_axis(columns="wins")
+
+    def finish_distribution(self):
+        """P(team finishes in place k), 1 = first."""
+        return pd.DataFrame(self.finish_counts / self.n_seasons, index=self.teams,
+                            columns=range(1, len(self.teams) + 1)).rename_axis(columns="place")
+
+    def summary(self):
+        wins = np.arange(self.win_counts.shape[1])
+        return pd.DataFrame({
+            "expected_wins": (self.win_counts * wins).sum(axis=1) / self.n_seasons,
+            "first_place": self.finish_counts[:, 0] / self.n_seasons,
+            "playoff_odds": self.playoff_counts / self.n_seasons,
+        }, index=self.teams).sort_values("expected_wins", ascending=False)
+
+
+def simulate_seasons(standings, n_seasons=20_000, games_per_pair=2, playoff_spots=4,
+                     home_edge=0.0, workers=None, seed=None, matrix=None):
+    """Simulate the conference's full round robin `n_seasons` times on a process pool.
+
+    Pass `matrix` to use your own P(home beats away) table instead of log5
+    from the standings (for example one built from monte_carlo.Simulator).
+    """
+    strength = team_strengths(standings)
+    teams = strength.index
+    if matrix is None:
+        matrix = matchup_matrix(strength.to_numpy(), home_edge)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    n_teams = len(teams)
+    home, away = round_robin(n_teams, games_per_pair)
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [n_seasons // workers + (1 if w < n_seasons % workers else 0) for w in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+
+    start = time.perf_counter()
+    shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+    try:
+        np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, n_teams)) as pool:
+            futures = [pool.submit(_simulate_chunk, size, home, away, playoff_spots, s)
+                       for size, s in zip(chunks, seeds) if size]
+            parts = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    win_counts, finish_counts, playoff_counts = (sum(p[i] for p in parts) for i in range(3))
+    return SeasonResults(teams, n_seasons, win_counts, finish_counts, playoff_counts,
+                         time.perf_counter() - start)
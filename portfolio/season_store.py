@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental, per-game storage for the season play-by-play.
+
+Each processed box score is written to its own file under games/, and
+manifest.json remembers which URL went to which file along with a hash of
+the scraped play-by-play. A refresh only loads and processes URLs that are
+new (or, with recheck=True, whose play-by-play hash changed), so a
+mid-season run touches a handful of games and never holds more than one
+game in memory.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from portfolio.instrument import stage
+
+
+def frame_hash(df):
+    """Stable content hash of a scraped frame."""
+    return hashlib.sha256(df.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+def game_id(url):
+    # Readable tail of the URL plus a short hash so two games can't collide
+    tail = "_".join(p for p in url.rstrip("/").split("/")[-2:] if p)
+    tail = re.sub(r"[^A-Za-z0-9_-]+", "-", tail)[:60]
+    return f"{tail}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+class SeasonStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self.games_dir = os.path.join(directory, "games")
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.lock = threading.Lock()
+        os.makedirs(self.games_dir, exist_ok=True)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {}
+
+    def _save_manifest(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def _path(self, entry):
+        return os.path.join(self.games_dir, entry["file"])
+
+    def write_game(self, gid, rows):
+        rows.to_csv(os.path.join(self.games_dir, gid + ".csv"), index=False)
+        return gid + ".csv"
+
+    def ingest(self, url, load, process, recheck=False):
+        """Bring one game up to date; returns "skipped", "unchanged", "added" or "updated".
+
+        load(url) returns the scraped play-by-play frame and process(frame)
+        the rows to store. Known URLs are skipped without loading unless
+        `recheck` is set, in which case they're reloaded and only
+        re-processed when the hash of the scraped frame changed.
+        """
+        with self.lock:
+            known = self.manifest.get(url)
+        if known and not recheck:
+            return "skipped"
+
+        raw = load(url)
+        digest = frame_hash(raw)
+        if known and known["sha"] == digest:
+            return "unchanged"
+
+        gid = game_id(url)
+        # Every stored row says which game it's from, so a season read back can be split again
+        rows = process(raw).assign(Game=gid)
+        with stage("write_csv", item=url) as s:
+            s.rows = len(rows)
+            file = self.write_game(gid, rows)
+        entry = {"file": file, "sha": digest,
+                 "rows": len(rows), "updated": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with self.lock:
+            self.manifest[url] = entry
+            self._save_manifest()
+        return "updated" if known else "added"
+
+    def urls(self):
+        with self.lock:
+            return list(self.manifest)
+
+    def iter_games(self, urls=None):
+        """Yield (url, frame) one game at a time; every frame has a Game column."""
+        for url in urls or self.urls():
+            entry = self.manifest.get(url)
+            if entry and os.path.exists(self._path(entry)):
+                df = pd.read_csv(self._path(entry))
+                # Games stored before the column existed get it on the way out
+                yield url, df if "Game" in df.columns else df.assign(Game=game_id(url))
+
+    def read(self, urls=None):
+        """Every stored game as one frame, in the given (or manifest) order."""
+        frames = [df for _, df in self.iter_games(urls)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def export_csv(self, path, urls=None):
+        """Write all games to one CSV, appending game by game so memory stays at one game."""
+        first = True
+        for _, df in self.iter_games(urls):
+            df.to_csv(path, index=False, mode="w" if first else "a", header=first)
+            first = False
+        return path
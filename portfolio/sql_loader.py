@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Loads the cleaned scrape frames into Postgres (or SQLite for testing).
+
+Tables are created from stats_schema's table specs with a primary key on
+each table's natural key, so re-loading a scrape updates rows instead of
+duplicating them. On Postgres every frame is streamed into a temp staging
+table with COPY and merged with one INSERT ... ON CONFLICT DO UPDATE; on
+SQLite the same upsert runs as an executemany. A whole scrape is one
+transaction: either every table is updated or none are.
+"""
+
+import io
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from portfolio.instrument import stage
+from portfolio.stats_schema import SPECS
+
+
+class TableSchema:
+    def __init__(self, name, key, columns):
+        self.name = name
+        self.key = tuple(key)
+        self.columns = dict(columns)  # column -> "text" / "integer" / "real"
+
+    def create_sql(self):
+        cols = ",\n  ".join(f'"{c}" {t}' + (" NOT NULL" if c in self.key else "") for c, t in self.columns.items())
+        keys = ", ".join(f'"{k}"' for k in self.key)
+        return f'CREATE TABLE IF NOT EXISTS "{self.name}" (\n  {cols},\n  PRIMARY KEY ({keys})\n)'
+
+
+SQL_TYPES = {"string": "text", "Int16": "integer", "Int32": "integer", "float64": "real"}
+
+
+def from_spec(spec):
+    """TableSchema for a stats_schema.TableSpec: key columns first, then every typed target.
+
+    Database column names are lower case (prepare lower-cases the frame), so
+    the team tables' Player column is stored as player.
+    """
+    targets = {c.lower(): t for c, t in spec.targets().items()}
+    key = tuple(k.lower() for k in spec.key)
+    columns = {k: SQL_TYPES[targets[k]] if k in targets else "text" for k in key if k != "season_year"}
+    columns["season_year"] = "integer"
+    columns.update({c: SQL_TYPES[t] for c, t in targets.items() if c not in columns})
+    return TableSchema(spec.name, key, columns)
+
+
+SCHEMA = {name: from_spec(spec) for name, spec in SPECS.items()}
+
+# Pre-normalizer names for a few schema columns, so older CSV exports still load
+COLUMN_ALIASES = {
+    "tm": "team", "w": "wins", "l": "losses",
+    "ra/9": "runs_per_9", "h/9": "hits_per_9", "hr/9": "homeruns_per_9", "bb/9": "walks_per_9",
+    "so/9": "strikeouts_per_9", "so/w": "strikeout_to_walk",
+}
+
+
+def prepare(df, schema, team=None):
+    """Frame with exactly the schema's columns, typed, one row per natural key."""
+    df = df.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.rename(columns=COLUMN_ALIASES)
+    df = df.loc[:, ~df.columns.duplicated()]
+    if team is not None and "team" not in df.columns:
+        df["team"] = team
+
+    missing_keys = [k for k in schema.key if k not in df.columns]
+    if missing_keys:
+        raise ValueError(f"{schema.name}: missing key column(s) {missing_keys}")
+    extra = [c for c in df.columns if c not in schema.columns]
+    if extra:
+        print(f"⚠️ {schema.name}: ignoring columns not in the schema: {extra}")
+
+    out = pd.DataFrame(index=df.index)
+    for col, kind in schema.columns.items():
+        values = df[col] if col in df.columns else pd.Series(pd.NA, index=df.index)
+        if kind == "text":
+            out[col] = values.astype("string").str.strip()
+        else:
+            numbers = pd.to_numeric(values.astype("string").str.replace(",", "").str.strip(), errors="coerce")
+            out[col] = numbers.round().astype("Int64") if kind == "integer" else numbers.astype("Float64")
+    out = out.dropna(subset=list(schema.key))
+    return out.drop_duplicates(subset=list(schema.key), keep="last").reset_index(drop=True)
+
+
+def _quoted(cols):
+    return ", ".join(f'"{c}"' for c in cols)
+
+
+def _conflict_sql(schema):
+    updates = [c for c in schema.columns if c not in schema.key]
+    return (f"ON CONFLICT ({_quoted(schema.key)}) DO UPDATE SET "
+            + ", ".join(f'"{c}" = excluded."{c}"' for c in updates))
+
+
+def _copy_upsert(conn, schema, rows):
+    # COPY into a staging table, then one set-based upsert into the real table
+    stage = f"stage_{schema.name}"
+    cols = _quoted(schema.columns)
+    buf = io.StringIO()
+    rows.to_csv(buf, index=False, header=False)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f'DROP TABLE IF EXISTS "{stage}"')
+        cursor.execute(f'CREATE TEMP TABLE "{stage}" (LIKE "{schema.name}") ON COMMIT DROP')
+        copy_sql = f'COPY "{stage}" ({cols}) FROM STDIN WITH (FORMAT csv)'
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buf.seek(0)
+            cursor.copy_expert(copy_sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buf.getvalue())
+        cursor.execute(f'INSERT INTO "{schema.name}" ({cols}) SELECT {cols} FROM "{stage}" {_conflict_sql(schema)}')
+    finally:
+        cursor.close()
+
+
+def _executemany_upsert(conn, schema, rows):
+    params = ", ".join(f":p{i}" for i in range(len(schema.columns)))
+    sql = text(f'INSERT INTO "{schema.name}" ({_quoted(schema.columns)}) VALUES ({params}) {_conflict_sql(schema)}')
+    records = rows.astype(object).where(rows.notna(), None).to_numpy().tolist()
+    conn.execute(sql, [{f"p{i}": v for i, v in enumerate(r)} for r in records])
+
+
+class LoadReport:
+    def __init__(self):
+        self.rows = {}
+        self.seconds = {}
+        self.total_seconds = 0.0
+
+    def print_summary(self):
+        total = sum(self.rows.values())
+        rate = total / self.total_seconds if self.total_seconds else 0.0
+        print(f"Loaded {total:,} rows into {len(self.rows)} tables in {self.total_seconds:.2f}s ({rate:,.0f} rows/s)")
+        for name, n in self.rows.items():
+            s = self.seconds[name]
+            print(f"  {name}: {n:,} rows, {s:.2f}s ({n / s if s else 0:,.0f} rows/s)")
+
+
+def load_scrape(engine, frames, team=None):
+    """Upsert {table name: cleaned frame} in one transaction and return a LoadReport.
+
+    `team` fills the team column for frames that don't have one (the
+    clean_team_stats frames). Frames that are None are skipped.
+    """
+    report = LoadReport()
+    start = time.perf_counter()
+    upsert = _copy_upsert if engine.dialect.name == "postgresql" else _executemany_upsert
+    with engine.begin() as conn:
+        for name, df in frames.items():
+            if df is None:
+                continue
+            schema = SCHEMA[name]
+            table_start = time.perf_counter()
+            with stage("load_" + name) as s:
+                conn.execute(text(schema.create_sql()))
+                rows = prepare(df, schema, team)
+                if len(rows):
+                    upsert(conn, schema, rows)
+                s.rows = len(rows)
+            report.rows[name] = len(rows)
+            report.seconds[name] = time.perf_counter() - table_start
+    report.total_seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Declarative cleaning for the scraped stats tables.
+
+Each table has one TableSpec: which rows to throw out, which source columns
+become which target columns with what dtype, and which "A-B" columns split
+into two. normalize() applies a spec in one pass, building every output
+column straight from the raw frame, so there are no intermediate copies of
+the whole table and the stats come out numeric instead of object strings.
+Columns no spec lists are kept under their lower-cased header, numeric when
+every value in them parses as a number.
+sql_loader builds its database tables from the same specs.
+"""
+
+import numpy as np
+import pandas as pd
+
+from portfolio.instrument import stage
+
+
+class Col:
+    """Target column from the first `sources` header that exists on the page."""
+
+    def __init__(self, sources, target, dtype, default=None):
+        self.sources = (sources,) if isinstance(sources, str) else tuple(sources)
+        self.target = target
+        self.dtype = dtype  # "string", "Int32" or "float64"
+        self.default = default  # used when none of the sources is on the page
+
+
+class Split:
+    """"3-4" style column split on `sep` into several typed targets."""
+
+    def __init__(self, source, targets, dtype="Int32", sep="-"):
+        self.source = source
+        self.targets = tuple(targets)
+        self.dtype = dtype
+        self.sep = sep
+
+
+class TableSpec:
+    def __init__(self, name, key, columns, splits=(), drop=(), exclude=None, passthrough=True):
+        self.name = name
+        self.key = tuple(key)  # natural key once team and season_year are filled in
+        self.columns = list(columns)
+        self.splits = list(splits)
+        self.drop = set(drop)
+        self.exclude = exclude  # (source column, regex) of rows to throw out, e.g. totals
+        self.passthrough = passthrough  # keep unlisted columns, lower-cased, numeric when they parse
+
+    def targets(self):
+        """Every typed target column: {name: dtype}."""
+        out = {c.target: c.dtype for c in self.columns}
+        for s in self.splits:
+            out.update({t: s.dtype for t in s.targets})
+        return out
+
+
+def _ints(*pairs):
+    return [Col(src, dst, "Int32") for src, dst in pairs]
+
+
+def _floats(*pairs):
+    return [Col(src, dst, "float64") for src, dst in pairs]
+
+
+def player_name(values):
+    # "Smith, John 12 ..." -> "Smith, John": everything before the first digit
+    return values.str.split(r"\d", n=1, regex=True).str[0].str.rstrip(", ")
+
+
+TEAM_KEY = ("team", "season_year")
+# Team pages have always come out with a capitalized Player column
+PLAYER_KEY = ("Player", "team", "season_year")
+PLAYER_ROWS = ("Player", r"Total|Opponents")
+LEAGUE_ROWS = ("Tm", r"^League Totals$")
+
+SPECS = {s.name: s for s in [
+    TableSpec("conference_standings", TEAM_KEY, [
+        Col("Tm", "team", "string"),
+        Col("Conference", "conference", "string"),
+        *_ints(("W", "wins"), ("L", "losses")),
+        Col("Ties", "ties", "Int32", default=0),
+    ], drop=["GB", "W-L%"]),
+
+    TableSpec("conference_batting", TEAM_KEY, [
+        Col("Tm", "team", "string"),
+        *_ints(("#Bat", "batters_used"), ("G", "games_played"), ("PA", "plate_appearances"), ("AB", "at_bats"),
+               ("R", "runs"), ("H", "hits"), ("2B", "doubles"), ("3B", "triples"), ("HR", "homeruns"),
+               ("RBI", "rbi"), ("SB", "stolen_bases"), ("CS", "caught_stealing"), ("BB", "walks"),
+               ("SO", "strikeouts"), ("TB", "total_bases"), ("GDP", "gdp"), ("HBP", "hbp"),
+               ("SH", "sac_bunts"), ("SF", "sac_flies"), ("IBB", "ibb")),
+        *_floats(("R/G", "runs_per_game"), ("BA", "avg"), ("OBP", "obp"), ("SLG", "slg"), ("OPS", "ops")),
+    ], drop=["Aff", "BatAge", "Conference"], exclude=LEAGUE_ROWS),
+
+    TableSpec("conference_pitching", TEAM_KEY, [
+        Col("Tm", "team", "string"),
+        *_ints(("#P", "pitchers_used"), ("W", "wins"), ("L", "losses"), ("G", "games_played"),
+               ("CG", "complete_games"), ("SHO", "shutouts"), ("SV", "saves"), ("H", "hits"), ("R", "runs"),
+               ("ER", "earned_runs"), ("HR", "homeruns"), ("BB", "walks"), ("IBB", "ibb"), ("HBP", "hbp"),
+               ("BK", "bk"), ("WP", "wp"), ("SO", "strikeouts"), ("BF", "bf")),
+        *_floats((("RA9", "RA/9"), "runs_per_9"), ("R/G", "runs_per_game"), ("ERA", "era"),
+                 ("IP", "innings_pitched"), ("WHIP", "whip"), (("H9", "H/9"), "hits_per_9"),
+                 (("HR9", "HR/9"), "homeruns_per_9"), (("BB9", "BB/9"), "walks_per_9"),
+                 (("SO9", "SO/9"), "strikeouts_per_9"), ("SO/W", "strikeout_to_walk")),
+    ], drop=["Aff", "PAge", "GS", "GF", "W-L%", "Conference"], exclude=LEAGUE_ROWS),
+
+    TableSpec("player_batting", PLAYER_KEY, [
+        Col("Player", "Player", "string"),
+        *_ints(("AB", "at_bats"), ("R", "runs"), ("H", "hits"), ("2B", "doubles"), ("3B", "triples"),
+               ("HR", "homeruns"), ("RBI", "rbi"), ("TB", "total_bases"), ("BB", "walks"), ("HBP", "hbp"),
+               ("SO", "strikeouts"), ("GDP", "gdp"), ("SF", "sac_flies"), ("SH", "sac_bunts"),
+               ("PA", "plate_appearances"), ("IBB", "ibb"), ("CS", "caught_stealing")),
+        *_floats(("AVG", "avg"), ("OB%", "obp"), ("SLG%", "slg"), ("OPS", "ops")),
+    ], splits=[Split("GP-GS", ["games_played", "games_started"]),
+               Split("SB-ATT", ["stolen_bases", "stolen_base_attempts"])],
+        drop=["#", "Bio Link"], exclude=PLAYER_ROWS),
+
+    TableSpec("player_pitching", PLAYER_KEY, [
+        Col("Player", "Player", "string"),
+        *_ints(("CG", "complete_games"), ("SV", "saves"), ("H", "hits"), ("R", "runs"), ("ER", "earned_runs"),
+               ("BB", "walks"), ("SO", "strikeouts"), ("2B", "doubles"), ("3B", "triples"), ("HR", "homeruns"),
+               ("AB", "at_bats"), ("WP", "wp"), ("HBP", "hbp"), ("BK", "bk"), ("SFA", "sac_flies"),
+               ("SHA", "sac_bunts"), ("BF", "bf"), ("IBB", "ibb")),
+        *_floats(("ERA", "era"), ("WHIP", "whip"), ("IP", "innings_pitched"), ("B/AVG", "batting_avg_against")),
+    ], splits=[Split("W-L", ["wins", "losses"]), Split("APP-GS", ["appearances", "games_started"])],
+        drop=["#", "Bio Link", "SHO"], exclude=PLAYER_ROWS),
+
+    TableSpec("player_fielding", PLAYER_KEY, [
+        Col("Player", "Player", "string"),
+        *_ints(("C", "chances"), ("PO", "putouts"), ("A", "assists"), ("E", "errors"), ("DP", "double_plays"),
+               ("SBA", "sba"), (("CSB", "CS"), "cs"), ("PB", "pb"), ("CI", "ci")),
+        *_floats(("FLD%", "fielding_pct"),),
+    ], drop=["#", "Bio Link"], exclude=PLAYER_ROWS),
+]}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _typed(values, dtype):
+    if dtype == "string":
+        return pd.Series(values, dtype="string").str.strip().array
+    # "1,234", "-", "" and friends all end up as numbers or <NA>
+    numbers = pd.to_numeric(pd.Series(values, dtype="string").str.replace(",", "", regex=False).str.strip(),
+                            errors="coerce")
+    if dtype == "float64":
+        return numbers.astype("float64").to_numpy()
+    return numbers.round().astype(dtype).array
+
+
+def _inferred(values):
+    # A column no spec knows about: Int32 / float64 if every value that's there
+    # parses as a number, trimmed strings otherwise
+    text = pd.Series(values, dtype="string").str.strip()
+    present = text.notna() & (text != "") & (text != "-")
+    numbers = pd.to_numeric(text.str.replace(",", "", regex=False), errors="coerce")
+    if not present.any() or numbers[present].isna().any():
+        return text.array
+    numbers = numbers.where(present)
+    if (numbers.dropna() % 1 == 0).all():
+        return numbers.astype("Int32").array
+    return numbers.astype("float64").to_numpy()
+
+
+def normalize(df, spec, season_year, team=None):
+    """Apply `spec` to a raw scraped frame; returns a new, typed frame.
+
+    season_year (and `team`, for the per-team tables) are stamped on every
+    row. Raises SchemaError when a key column can't be found, which usually
+    means the page layout changed.
+    """
+    headers = {str(c).strip(): c for c in df.columns}
+    keep = np.ones(len(df), dtype=bool)
+    if spec.exclude and spec.exclude[0] in headers:
+        col, pattern = spec.exclude
+        keep = ~df[headers[col]].astype("string").str.contains(pattern, regex=True, na=False).to_numpy()
+
+    def raw(name):
+        return df[headers[name]].to_numpy(dtype=object)[keep]
+
+    n = int(keep.sum())
+    out, used = {}, set()
+    for col in spec.columns:
+        source = next((s for s in col.sources if s in headers), None)
+        if source is None:
+            if col.target in spec.key:
+                raise SchemaError(f"{spec.name}: none of {col.sources} on the page (columns: {list(headers)})")
+            if col.default is None:
+                continue
+            values = np.full(n, col.default, dtype=object)
+        else:
+            used.add(source)
+            values = raw(source)
+        out[col.target] = _typed(values, col.dtype)
+    if "Player" in out:
+        out["Player"] = player_name(pd.Series(out["Player"])).array
+
+    for split in spec.splits:
+        if split.source not in headers:
+            continue
+        used.add(split.source)
+        parts = pd.Series(raw(split.source), dtype="string").str.split(split.sep, n=len(split.targets) - 1,
+                                                                       expand=True, regex=False)
+        for i, target in enumerate(split.targets):
+            out[target] = _typed(parts[i].to_numpy(dtype=object) if i in parts.columns else np.full(n, None),
+                                 split.dtype)
+
+    if spec.passthrough:
+        for name in headers:
+            if name not in used and name not in spec.drop:
+                target = name.lower()
+                if target not in out:
+                    out[target] = _inferred(raw(name))
+
+    if team is not None and "team" not in out:
+        out["team"] = pd.array([team] * n, dtype="string")
+    out["season_year"] = pd.array([int(season_year)] * n, dtype="Int16")
+    return pd.DataFrame(out)
+
+
+def clean_conference_stats(batting, pitching, standings, season_year=2025):
+    # One pass per table from the specs in stats_schema: totals rows out,
+    # columns renamed and typed, season_year stamped on
+    with stage("clean_conference_stats") as s:
+        batting = normalize(batting, SPECS["conference_batting"], season_year)
+        pitching = normalize(pitching, SPECS["conference_pitching"], season_year)
+        standings = normalize(standings, SPECS["conference_standings"], season_year)
+        s.rows = len(batting) + len(pitching) + len(standings)
+    return batting, pitching, standings
+
+
+def clean_team_stats(individual_batting, individual_pitching, individual_fielding, season_year=2025):
+    # GP-GS, SB-ATT, W-L and APP-GS are split into numeric columns by the spec
+    with stage("clean_team_stats") as s:
+        individual_batting = normalize(individual_batting, SPECS["player_batting"], season_year)
+        individual_pitching = normalize(individual_pitching, SPECS["player_pitching"], season_year)
+        individual_fielding = normalize(individual_fielding, SPECS["player_fielding"], season_year)
+        s.rows = len(individual_batting) + len(individual_pitching) + len(individual_fielding)
+    return individual_batting, individual_pitching, individual_fielding
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Constant-memory accumulators for simulation output.
+
+Batches of trial results are folded in as they come and then thrown away,
+so memory doesn't grow with the trial count. Every accumulator can report a
+confidence interval, which is what adaptive runs use to decide when to stop.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+
+def z_score(confidence):
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+class Welford:
+    """Running mean and variance (Welford, merged a batch at a time with Chan's formula)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+    def interval(self, confidence=0.95):
+        half = z_score(confidence) * np.sqrt(self.variance / self.n) if self.n > 1 else float("inf")
+        return self.mean - half, self.mean + half
+
+
+class Histogram:
+    """Counts of integer outcomes 0..max_value; anything bigger lands in the last bin."""
+
+    def __init__(self, max_value=30):
+        self.counts = np.zeros(max_value + 1, dtype=np.int64)
+
+    def update(self, values):
+        values = np.minimum(np.asarray(values, dtype=np.int64), len(self.counts) - 1)
+        self.counts += np.bincount(values, minlength=len(self.counts))
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def distribution(self):
+        return pd.Series(self.counts / max(self.n, 1)).rename_axis("runs")
+
+
+class WinCounter:
+    """Wins, losses and ties for one side; the interval is Wilson's for P(win)."""
+
+    def __init__(self):
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+
+    def update(self, runs_for, runs_against):
+        runs_for, runs_against = np.asarray(runs_for), np.asarray(runs_against)
+        self.wins += int((runs_for > runs_against).sum())
+        self.losses += int((runs_for < runs_against).sum())
+        self.ties += int((runs_for == runs_against).sum())
+
+    @property
+    def n(self):
+        return self.wins + self.losses + self.ties
+
+    @property
+    def mean(self):
+        return self.wins / self.n if self.n else float("nan")
+
+    def interval(self, confidence=0.95):
+        if not self.n:
+            return 0.0, 1.0
+        z = z_score(confidence)
+        p, n = self.mean, self.n
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return center - half, center + half
+
+
+class Estimate:
+    """What an adaptive run ended with, plus the accumulators it filled."""
+
+    def __init__(self, metric, accumulator, confidence, target_width, extras=None):
+        self.metric = metric
+        self.value = accumulator.mean
+        self.low, self.high = accumulator.interval(confidence)
+        self.width = self.high - self.low
+        self.trials = accumulator.n
+        self.confidence = confidence
+        self.converged = self.width <= target_width
+        self.extras = extras or {}
+
+    def __repr__(self):
+        return (f"Estimate({self.metric}={self.value:.4f}, {self.confidence:.0%} CI "
+                f"[{self.low:.4f}, {self.high:.4f}], width={self.width:.4f}, trials={self.trials:,}, "
+                f"converged={self.converged})")
+
+
+def run_until(step, accumulator, target_width, confidence=0.95, batch=10_000,
+              min_trials=10_000, max_trials=10_000_000):
+    """Call step(n) in batches until the accumulator's CI is narrower than target_width.
+
+    `step(n)` must simulate n more trials and feed them into the
+    accumulators. Stops early once at least min_trials have run and the
+    interval is narrow enough, or when max_trials is reached.
+    """
+    while accumulator.n < max_trials:
+        step(min(batch, max_trials - accumulator.n))
+        if accumulator.n >= min_trials:
+            low, high = accumulator.interval(confidence)
+            if high - low <= target_width:
+                break
+    return accumulator
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parse only the tables we want from a page.
+
+pd.read_html turns every table on a page into a DataFrame, then the
+scrapers keep a few of them by position. Here each wanted table is
+described by a TableSignature (header cells it must have, ones it must not,
+or a caption). locate() walks the page's <table> elements once, comparing
+only their header rows, and just the matches are handed to pd.read_html.
+When a required table isn't there, TableNotFound lists the header rows that
+were on the page so a layout change is obvious.
+"""
+
+import re
+from io import StringIO
+
+import lxml.html
+import pandas as pd
+
+
+class TableNotFound(LookupError):
+    pass
+
+
+def _text(element):
+    return re.sub(r"\s+", " ", element.text_content()).strip()
+
+
+def header_cells(table):
+    """Header texts of a table: the last <thead> row with <th> cells, else the first row."""
+    rows = [tr for tr in table.xpath("./thead/tr") if tr.xpath("./th")]
+    if not rows:
+        rows = table.xpath("./tr[1] | ./tbody/tr[1]")
+    if not rows:
+        return ()
+    return tuple(_text(c) for c in rows[-1].xpath("./th | ./td"))
+
+
+def caption(table):
+    found = table.xpath("./caption")
+    return _text(found[0]) if found else ""
+
+
+class TableSignature:
+    """What a wanted table looks like.
+
+    `headers` must all be header cells (exact text, whitespace collapsed),
+    `exclude` must not be, and `caption` is a regex searched in the
+    <caption>. Normally the first match wins (`index` picks a later one);
+    with many=True every match is returned, in page order.
+    """
+
+    def __init__(self, name, headers=(), exclude=(), caption=None, index=0, many=False, required=True):
+        self.name = name
+        self.headers = set(headers)
+        self.exclude = set(exclude)
+        self.caption = re.compile(caption) if caption else None
+        self.index = index
+        self.many = many
+        self.required = required
+
+    def matches(self, headers, caption_text):
+        cells = set(headers)
+        if not self.headers <= cells or self.exclude & cells:
+            return False
+        return self.caption is None or bool(self.caption.search(caption_text))
+
+
+class Tables(dict):
+    """name -> DataFrame (or list of them for many=True), plus the header rows seen on the page."""
+
+    def __init__(self, *args, seen=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seen = list(seen)
+
+
+def locate(html, signatures):
+    """Find the <table> elements for each signature without parsing any table bodies."""
+    doc = lxml.html.fromstring(html) if isinstance(html, str) else html
+    found = {s.name: [] for s in signatures}
+    counts = {s.name: 0 for s in signatures}
+    seen = []
+    open_ = list(signatures)
+    for table in doc.iter("table"):
+        headers = header_cells(table)
+        seen.append(headers)
+        cap = caption(table) if any(s.caption for s in open_) else ""
+        for s in list(open_):
+            if not s.matches(headers, cap):
+                continue
+            if s.many:
+                found[s.name].append(table)
+                continue
+            if counts[s.name] == s.index:
+                found[s.name].append(table)
+                open_.remove(s)
+            counts[s.name] += 1
+        if not open_:
+            break
+    return found, seen
+
+
+def parse_table(element):
+    return pd.read_html(StringIO(lxml.html.tostring(element, encoding="unicode")))[0]
+
+
+class TableExtractor:
+    """Callable html -> Tables, usable as fetch_tables(parse=...)."""
+
+    def __init__(self, *signatures):
+        self.signatures = list(signatures)
+
+    def __call__(self, html):
+        if not html or "<table" not in html:
+            return Tables()
+        found, seen = locate(html, self.signatures)
+        tables = Tables(seen=seen)
+        for s in self.signatures:
+            if s.many:
+                tables[s.name] = [parse_table(t) for t in found[s.name]]
+            elif found[s.name]:
+                tables[s.name] = parse_table(found[s.name][0])
+        return tables
+
+    def missing(self, tables):
+        return [s.name for s in self.signatures
+                if s.required and (s.name not in tables or (s.many and not tables[s.name]))]
+
+    def ready(self, tables):
+        return not self.missing(tables)
+
+    def require(self, tables, url=""):
+        """Return `tables`, or raise TableNotFound naming what's missing and what was there."""
+        missing = self.missing(tables)
+        if missing:
+            seen = "\n".join(f"  {list(h)}" for h in getattr(tables, "seen", []))
+            raise TableNotFound(f"{url}: no table matching {missing}. Header rows on the page:\n{seen or '  (none)'}")
+        return tables
@@ -0,0 +1,85 @@
+"""merge_delta and the count check that keeps watermark refreshes honest."""
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from portfolio import asset_snapshots
+from portfolio.asset_snapshots import KEY, SnapshotStore, merge_delta
+
+
+def _rows(serials, **extra):
+    return pd.DataFrame({KEY: serials, "Net Book Value": [100.0] * len(serials), **extra})
+
+
+def test_merge_delta_insert_update_remove():
+    detail = _rows(["A", "B", "C"])
+    delta = pd.DataFrame({KEY: ["B", "C", "D", "E"], "Net Book Value": [80.0, 70.0, 60.0, 50.0],
+                          "qualifies": [1, 0, 1, 0]})
+    merged, changes = merge_delta(detail, delta)
+
+    assert sorted(merged[KEY]) == ["A", "B", "D"]
+    assert merged.set_index(KEY)["Net Book Value"].to_dict() == {"A": 100.0, "B": 80.0, "D": 60.0}
+    assert "qualifies" not in merged.columns
+    # B was only updated and E was never in the set, so neither is a change
+    assert sorted(zip(changes[KEY], changes["change"])) == [("C", "removed"), ("D", "added")]
+
+
+def test_merge_delta_keeps_the_last_row_per_serial():
+    delta = pd.DataFrame({KEY: ["A", "A"], "Net Book Value": [1.0, 2.0], "qualifies": [1, 0]})
+    merged, changes = merge_delta(_rows(["A"]), delta)
+    assert merged.empty
+    assert changes.to_dict("list") == {KEY: ["A"], "change": ["removed"]}
+
+
+class FakeServer:
+    """What the snapshot queries would return: the full set, a delta and the server counts."""
+
+    def __init__(self, serials):
+        self.serials = list(serials)
+        self.delta = pd.DataFrame({KEY: [], "Net Book Value": [], "qualifies": []})
+
+    def stream_to_parquet(self, conn, query, path, chunksize=50_000, params=()):
+        _rows(self.serials).to_parquet(path, index=False)
+        return len(self.serials)
+
+    def fetch_frame(self, conn, query, params=()):
+        return self.delta
+
+    def asset_counts(self, conn, query=None):
+        return {"serial_num_count": len(set(self.serials)), "item_ids_count": 7}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer(["A", "B", "C"])
+    for name in ("stream_to_parquet", "fetch_frame", "asset_counts"):
+        monkeypatch.setattr(asset_snapshots, name, getattr(server, name))
+    return server
+
+
+def test_watermark_refresh_trusts_a_matching_count(tmp_path, server):
+    store = SnapshotStore(str(tmp_path))
+    day = datetime.date(2026, 3, 2)
+    assert store.refresh(None, today=day)["mode"] == "full"
+
+    server.serials.append("D")
+    server.delta = pd.DataFrame({KEY: ["D"], "Net Book Value": [10.0], "qualifies": [1]})
+    row = store.refresh(None, today=day + datetime.timedelta(days=1))
+    assert (row["mode"], row["serial_num_count"], row["rows_read"]) == ("watermark", 4, 1)
+    assert sorted(store.detail()[KEY]) == ["A", "B", "C", "D"]
+
+
+def test_watermark_refresh_rescans_when_the_count_disagrees(tmp_path, server):
+    store = SnapshotStore(str(tmp_path))
+    day = datetime.date(2026, 3, 2)
+    store.refresh(None, today=day)
+
+    # B left the set through a column the watermark query doesn't look at
+    server.serials.remove("B")
+    row = store.refresh(None, today=day + datetime.timedelta(days=1))
+    assert (row["mode"], row["serial_num_count"]) == ("watermark+full", 2)
+    assert sorted(store.detail()[KEY]) == ["A", "C"]
+    assert store.kpis()["serial_num_count"].tolist() == [3, 2]
+    assert store.state["last_full"] == "2026-03-03"
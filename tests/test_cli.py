@@ -0,0 +1,24 @@
+"""The argument lists BeginningMonteCarlo.py hands to portfolio.cli parse."""
+
+import pytest
+
+from BeginningMonteCarlo import pipeline_args
+from portfolio.cli import build_parser
+
+
+@pytest.mark.parametrize("profile", [[], ["process_game"], ["process_game", "crawl_box_scores"]])
+def test_driver_arguments_parse(profile):
+    parser = build_parser()
+    commands = []
+    for argv in pipeline_args(profile=profile, recheck=True):
+        args = parser.parse_args(argv)
+        assert args.profile == profile
+        commands.append(args.command)
+    assert commands == ["crawl", "process", "simulate"]
+
+
+def test_profile_does_not_swallow_the_subcommand():
+    args = build_parser().parse_args(["--profile", "process_game", "crawl", "box-scores"])
+    assert args.profile == ["process_game"]
+    assert (args.command, args.target) == ("crawl", "box-scores")
+    assert build_parser().parse_args(["crawl", "box-scores"]).profile == []
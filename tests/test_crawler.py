@@ -0,0 +1,81 @@
+"""crawl() retries and per-host pacing against a local http.server stand-in."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from portfolio.crawler import HostLimiter, crawl
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """/flaky answers 503 twice, then 200; /missing is always 404; anything else is 200."""
+
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] = self.hits.get(self.path, 0) + 1
+            n = self.hits[self.path]
+        if self.path == "/missing":
+            status = 404
+        elif self.path == "/flaky" and n <= 2:
+            status = 503
+        else:
+            status = 200
+        self.send_response(status)
+        self.end_headers()
+        self.wfile.write(b"<table><tr><th>A</th></tr><tr><td>1</td></tr></table>")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FlakyHandler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    r = requests.get(url, timeout=5)
+    r.raise_for_status()
+    return r.status_code
+
+
+def test_retries_503_but_not_404(server):
+    report = crawl([server + "/flaky", server + "/missing", server + "/ok"], get, workers=3, backoff=0.01)
+
+    assert report.results == {server + "/flaky": 200, server + "/ok": 200}
+    assert report.attempts == {server + "/flaky": 3, server + "/missing": 1, server + "/ok": 1}
+    [error] = report.errors
+    assert error.url == server + "/missing"
+    assert error.error_type == "HTTPError" and "404" in error.message
+    assert FlakyHandler.hits["/missing"] == 1
+
+
+def test_gives_up_after_retries(server):
+    report = crawl([server + "/flaky"], get, retries=1, backoff=0.01)
+    assert not report.ok()
+    assert report.attempts[server + "/flaky"] == 2
+    assert "503" in report.errors[0].message
+
+
+def test_limiter_paces_requests_per_host(server):
+    limiter = HostLimiter(rates={}, default_rate=20.0)
+    urls = [f"{server}/page{i}" for i in range(6)]
+    start = time.perf_counter()
+    report = crawl(urls, get, workers=6, limiter=limiter)
+    elapsed = time.perf_counter() - start
+
+    assert report.ok()
+    # One token up front, then one every 1/20 s for the other five
+    assert elapsed >= 5 / 20 * 0.9
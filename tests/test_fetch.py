@@ -0,0 +1,54 @@
+"""fetch_tables reads static and rendered pages the same way."""
+
+from collections import deque
+
+import pandas as pd
+import pytest
+
+from portfolio import fetch
+
+TABLE = "<table><thead><tr><th>Player</th><th>HR</th></tr></thead><tbody><tr><td>Smith</td><td>3</td></tr></tbody></table>"
+
+
+def _has_player_table(tables):
+    return any("Player" in t.columns for t in tables)
+
+
+def test_commented_tables_on_the_static_path(monkeypatch):
+    monkeypatch.setattr(fetch, "_get_static", lambda url, timeout: (f"<div><!--{TABLE}--></div>", None))
+    monkeypatch.setattr(fetch, "render_html", lambda *a, **k: pytest.fail("went to the browser"))
+    result = fetch.fetch_tables("https://example.edu/static", ready=_has_player_table)
+    assert result.path == "static"
+    assert result.tables[0]["HR"].tolist() == [3]
+
+
+def test_commented_tables_on_the_browser_path(monkeypatch):
+    # Static page without the table; the rendered page carries it inside a comment
+    rendered = f"<table><tr><th>Logo</th></tr><tr><td>x</td></tr></table><!--{TABLE}-->"
+    seen = []
+
+    def render(url, wait_xpath, min_count, timeout, loaded):
+        seen.append(loaded(rendered))
+        return rendered
+
+    monkeypatch.setattr(fetch, "_get_static", lambda url, timeout: ("<p>loading</p>", None))
+    monkeypatch.setattr(fetch, "render_html", render)
+    monkeypatch.setattr(fetch, "_cache", None)
+    result = fetch.fetch_tables("https://example.edu/rendered", ready=_has_player_table)
+    assert seen == [True]
+    assert result.path == "browser"
+    assert any(isinstance(t, pd.DataFrame) and "Player" in t.columns for t in result.tables)
+
+
+
+def test_fetch_log_keeps_summaries_of_the_last_pages(monkeypatch):
+    monkeypatch.setattr(fetch, "_get_static", lambda url, timeout: (TABLE, None))
+    monkeypatch.setattr(fetch, "_cache", None)
+    monkeypatch.setattr(fetch, "fetch_log", deque(maxlen=2))
+    for i in range(3):
+        fetch.fetch_tables(f"https://example.edu/{i}")
+
+    assert [r.url for r in fetch.fetch_log] == ["https://example.edu/1", "https://example.edu/2"]
+    record = fetch.fetch_log[-1]
+    assert (record.path, record.tables) == ("static", 1)
+    assert not hasattr(record, "__dict__")
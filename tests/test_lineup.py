@@ -0,0 +1,48 @@
+"""search_orders against expected_runs, and the simulator against both."""
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_lineup import synthetic_batting
+from portfolio.lineup import LineupModel, LineupSimulator, expected_runs, search_orders
+
+
+@pytest.fixture(scope="module")
+def model():
+    # Nine hitters, so the search covers every order of the whole roster
+    return LineupModel.from_batting(synthetic_batting(n=9, seed=4))
+
+
+@pytest.fixture(scope="module")
+def search(model):
+    return search_orders(model, workers=1)
+
+
+def test_search_matches_expected_runs_on_a_sample(model, search):
+    assert len(search.runs) == 362_880
+    assert search.orders[0].tolist() == list(range(9))
+    sample = np.random.default_rng(0).choice(len(search.runs), 40, replace=False)
+    for i in sample:
+        assert search.runs[i] == pytest.approx(expected_runs(model, search.orders[i]), abs=1e-8), search.orders[i]
+
+
+def test_best_order_is_the_maximum(model, search):
+    best = search.best()
+    assert expected_runs(model, best) == pytest.approx(search.runs.max(), abs=1e-8)
+    assert search.top(3)["expected_runs"].tolist() == sorted(search.runs, reverse=True)[:3]
+    # Spread between orders is real but small, as lineup studies find
+    assert 0 < search.runs.max() - search.runs.min() < 1
+
+
+def test_simulator_interval_covers_the_exact_value(model):
+    order = model.players
+    exact = expected_runs(model, order)
+    estimate = LineupSimulator(model, seed=1).estimate_runs(order, target_width=0.1, confidence=0.99)
+    assert estimate.converged
+    assert estimate.low <= exact <= estimate.high
+
+
+def test_search_needs_nine_players():
+    model = LineupModel.from_batting(synthetic_batting(n=12), players=[f"Player {i}" for i in range(1, 11)])
+    with pytest.raises(ValueError):
+        search_orders(model)
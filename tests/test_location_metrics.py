@@ -0,0 +1,122 @@
+"""LocationMetrics on a SQLite stand-in for the asset database, checked against brute force."""
+
+import datetime
+import random
+import sqlite3
+
+import pytest
+
+from portfolio.location_metrics import LocationMetrics
+
+NOW = datetime.datetime(2026, 6, 15, 9)
+LOC_KEYS = [106, 107, 108, 109]
+LOCATIONS = ["Warehouse", "Shop", "Yard", "Lost Equipment"]
+
+
+def build_database(path, seed=0):
+    rng = random.Random(seed)
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE Item (ItemKey, ItemID, ItemName, AutoReorder, ItemStatus, ExcludeFromPurchaseOrder,
+                           LastSaleDt, LastPurchDt, ItemGroup, ItemType);
+        CREATE TABLE ItemBkt (ItemBktKey, ItemKey);
+        CREATE TABLE ItemLocation (ItemBktKey, LocKey, OnHandQty);
+        CREATE TABLE ItemBkt_Exp (Item_ID, Item_Name, Item_Group, SerialNumbers_SerialNumber,
+                                  SerialNumbers_OriginalCost, SerialNumbers_PurchaseDate, SerialNumbers_BookValue,
+                                  SerialNumbers_OnHand, SerialNumbers_OnRent, SerialNumbers_Location,
+                                  SerialNumbers_ReadytoDepreciate, Item_Type, SerialNumbers_DateSold);
+    """)
+    serial = 0
+    for key in range(1, 401):
+        item_id = f"zz{key}" if key % 25 == 0 else f"I{key:04d}"
+        db.execute("INSERT INTO Item VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'Tools', 'serialized')", (
+            key, item_id, f"Item {key}", rng.choice(["False", "True"]), rng.choice(["Active", "Active", "Inactive"]),
+            rng.choice(["False", "False", "True"]),
+            (NOW - datetime.timedelta(days=rng.randint(0, 450))).isoformat(" "),
+            (NOW - datetime.timedelta(days=rng.randint(0, 450))).isoformat(" ")))
+        for bucket in range(2):
+            bkt = key * 10 + bucket
+            db.execute("INSERT INTO ItemBkt VALUES (?, ?)", (bkt, key))
+            for loc in rng.sample(LOC_KEYS, rng.randint(0, 2)):
+                db.execute("INSERT INTO ItemLocation VALUES (?, ?, ?)", (bkt, loc, rng.choice([0, 1, 5])))
+        for _ in range(rng.randint(0, 4)):
+            serial += 1
+            db.execute("INSERT INTO ItemBkt_Exp VALUES (?, ?, 'Tools', ?, 100, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                item_id, f"Item {key}", serial,
+                datetime.datetime(rng.randint(2017, 2025), rng.randint(1, 12), 1).isoformat(" "),
+                rng.choice([None, 0, 50]), rng.choice([0, 1]), rng.choice([0, 1]), rng.choice(LOCATIONS),
+                rng.choice(["False", "True"]), rng.choice(["serialized", "serialized", "bulk"]),
+                rng.choice([None, None, "2024-01-01"])))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def connect(tmp_path):
+    path = str(tmp_path / "dbname.db")
+    build_database(path)
+
+    def connect():
+        # [dbname].[Item] resolves to the attached database, like the SQL Server schema
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute("ATTACH DATABASE ? AS dbname", (path,))
+        return conn
+    return connect
+
+
+def brute_force(conn, loc_keys, purchased_since):
+    """The same KPIs from full table reads filtered in Python."""
+    since = NOW.replace(year=NOW.year - 1).isoformat(" ")
+    items = {row[0]: row for row in conn.execute("SELECT * FROM dbname.Item")}
+    buckets = dict(conn.execute("SELECT ItemBktKey, ItemKey FROM dbname.ItemBkt"))
+    at_loc = {}
+    for bkt, loc, qty in conn.execute("SELECT * FROM dbname.ItemLocation"):
+        key, item = buckets[bkt], items[buckets[bkt]]
+        at_loc.setdefault(loc, set()).add(item[1])
+        _, item_id, name, auto, status, exclude, sale, purch, _, _ = item
+        if (loc in loc_keys and auto == "False" and status == "Active" and not name.startswith("zz")
+                and not item_id.startswith("zz") and exclude == "False" and qty != 0
+                and sale >= since and purch >= since):
+            at_loc.setdefault(("kpi", loc), set()).add(item_id)
+    by_lockey = {loc: len(at_loc.get(("kpi", loc), ())) for loc in loc_keys}
+    total = len(set().union(*(at_loc.get(("kpi", loc), set()) for loc in loc_keys)))
+
+    stocked = set().union(*(at_loc.get(loc, set()) for loc in loc_keys))
+    serials = {}
+    for row in conn.execute("SELECT * FROM dbname.ItemBkt_Exp"):
+        item_id, _, _, number, _, bought, book, on_hand, on_rent, location, ready, kind, sold = row
+        if (ready == "False" and kind == "serialized" and location != "Lost Equipment" and sold is None
+                and (on_hand == 1 or on_rent == 1) and book is not None and book > 0
+                and bought >= purchased_since.isoformat(" ") and item_id in stocked):
+            serials.setdefault(location, set()).add(str(number))
+    return by_lockey, total, {loc: len(s) for loc, s in serials.items()}, len(set().union(*serials.values()))
+
+
+@pytest.mark.parametrize("loc_keys", [[106], [107, 109], LOC_KEYS])
+def test_counts_match_brute_force(connect, loc_keys):
+    purchased_since = datetime.datetime(2019, 7, 1)
+    metrics = LocationMetrics(connect, pool_size=2, ttl=300)
+    try:
+        result = metrics.metrics(loc_keys, purchased_since=purchased_since, now=NOW)
+    finally:
+        metrics.close()
+
+    by_lockey, total, by_location, serial_total = brute_force(connect(), loc_keys, purchased_since)
+    assert dict(zip(result["item_ids_by_lockey"]["LocKey"], result["item_ids_by_lockey"]["item_ids_count"])) \
+        == by_lockey
+    assert result["item_ids_count"] == total
+    assert dict(zip(result["serials_by_location"]["Location"],
+                    result["serials_by_location"]["serial_num_count"])) == by_location
+    assert result["serial_num_count"] == serial_total
+
+
+def test_repeat_refresh_is_served_from_cache(connect):
+    metrics = LocationMetrics(connect, pool_size=2, ttl=300)
+    try:
+        first = metrics.metrics(LOC_KEYS, now=NOW)
+        second = metrics.metrics(LOC_KEYS, now=NOW)
+    finally:
+        metrics.close()
+    assert metrics.misses == 4 and metrics.hits == 4
+    assert first["item_ids_count"] == second["item_ids_count"]
+    assert first["serial_num_count"] == second["serial_num_count"]
@@ -0,0 +1,109 @@
+"""PageCache TTL, ETag revalidation, LRU eviction and offline mode against a local http.server."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from portfolio.page_cache import CacheMiss, PageCache
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    """Serves `pages[path]` with an ETag of its version and answers 304 when it matches."""
+
+    pages = {}
+    hits = []
+
+    def do_GET(self):
+        body, version = self.pages[self.path]
+        etag = f'"v{version}"'
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    EtagHandler.pages = {"/a": ("<p>a</p>", 1), "/b": ("<p>b</p>", 1)}
+    EtagHandler.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, headers):
+    return requests.get(url, headers=headers, timeout=5)
+
+
+def test_fresh_within_ttl_then_revalidated(tmp_path, server):
+    cache = PageCache(str(tmp_path), ttl=0.2)
+    assert cache.fetch(server + "/a", get) == ("<p>a</p>", "fetched")
+    assert cache.fetch(server + "/a", get) == ("<p>a</p>", "fresh")
+    assert len(EtagHandler.hits) == 1
+
+    time.sleep(0.25)
+    assert cache.fetch(server + "/a", get) == ("<p>a</p>", "revalidated")
+    assert EtagHandler.hits[-1] == ("/a", '"v1"')
+    # The 304 restarted the TTL
+    assert cache.fetch(server + "/a", get) == ("<p>a</p>", "fresh")
+
+    EtagHandler.pages["/a"] = ("<p>a, changed</p>", 2)
+    time.sleep(0.25)
+    assert cache.fetch(server + "/a", get) == ("<p>a, changed</p>", "fetched")
+    assert cache.lookup(server + "/a")[1]["etag"] == '"v2"'
+
+
+def test_offline_serves_cached_pages_and_raises_on_misses(tmp_path, server):
+    PageCache(str(tmp_path), ttl=0).fetch(server + "/a", get)
+    offline = PageCache(str(tmp_path), ttl=0, offline=True)
+    before = len(EtagHandler.hits)
+    assert offline.fetch(server + "/a", get) == ("<p>a</p>", "offline")
+    with pytest.raises(CacheMiss):
+        offline.fetch(server + "/b", get)
+    assert len(EtagHandler.hits) == before
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.lookup("a")
+    cache.put("c", "z" * 10)
+    assert sorted(cache.index) == ["a", "c"]
+    assert cache.size() == 20
+    assert len(list((tmp_path / "objects").iterdir())) == 2
+
+
+def test_access_times_survive_a_restart(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=25, access_save_interval=3600)
+    cache.put("a", "x" * 10)
+    time.sleep(0.01)
+    cache.put("b", "y" * 10)
+    time.sleep(0.01)
+    cache.lookup("a")
+    cache.flush()
+
+    # b was used longest ago, so it goes even though a was stored first
+    reopened = PageCache(str(tmp_path), max_bytes=25)
+    reopened.put("c", "z" * 10)
+    assert sorted(reopened.index) == ["a", "c"]
+
+
+def test_access_times_are_saved_without_flush_after_the_interval(tmp_path):
+    cache = PageCache(str(tmp_path), access_save_interval=0)
+    cache.put("a", "x")
+    accessed = cache.lookup("a")[1]["accessed"]
+    assert PageCache(str(tmp_path)).index["a"]["accessed"] == accessed
@@ -0,0 +1,34 @@
+"""classify_plays must label every description exactly like parse_play."""
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_play_classifier import make_corpus
+from portfolio.play_classifier import PLAY_RULES, classify_plays
+from portfolio.plays import parse_play
+
+EDGE_CASES = [
+    "", None, np.nan, 42, "WALKED", "Smith struck out looking, Jones stole second.",
+    "Smith grounded out to ss; Jones caught stealing.", "Smith reached on a fielder's choice; wild pitch.",
+    "Smith to p for Jones.", "Smith singled, advanced to second on a throwing error.",
+    "Smith hit into double play ss to 2b to 1b.", "Smith hit into a triple play.",
+    "Smith popped up to 2b, sac fly attempt.", "balk", "passed ball; balk",
+]
+
+
+def test_matches_parse_play_on_the_corpus():
+    corpus = make_corpus(20_000, seed=1)
+    expected = corpus.map(parse_play)
+    got = pd.Series(np.asarray(classify_plays(corpus)), index=corpus.index)
+    assert (got != expected).sum() == 0
+
+
+def test_matches_parse_play_on_edge_cases():
+    got = list(classify_plays(pd.Series(EDGE_CASES, dtype=object)))
+    assert got == [parse_play(d) for d in EDGE_CASES]
+
+
+def test_every_keyword_alone():
+    # Each rule's keywords on their own, so the priority order is checked rule by rule
+    descriptions = [f"Smith {kw} (1-2 KBF)." for _, keywords in PLAY_RULES for kw in keywords]
+    assert list(classify_plays(descriptions)) == [parse_play(d) for d in descriptions]
@@ -0,0 +1,70 @@
+"""write_plays / read_plays round trip on a temporary dataset."""
+
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from portfolio.play_store import PARTITIONING, PLAY_DTYPES, partitions, plays_filter, read_plays, write_plays
+
+
+def plays(n, game="g1"):
+    return pd.DataFrame({
+        "Game": [game] * n,
+        "Play Description": [f"play {i}" for i in range(n)],
+        "Inning": [1 + i // 6 for i in range(n)],
+        "Half": ["Top" if i % 6 < 3 else "Bottom" for i in range(n)],
+        "Play Type": ["Single", "Out", "Strikeout"] * (n // 3) + ["Walk"] * (n % 3),
+        "Outs": [i % 3 for i in range(n)],
+        # Older CSVs stored bases as "[1, 0, 0]" strings
+        "Bases": ["[1, 0, 0]", "[0, 1, 1]", "[0, 0, 0]"] * (n // 3) + ["[1, 1, 1]"] * (n % 3),
+        "Runs": range(n),
+        "Runs_On_Play": [1] * n,
+        "Runs_In_Inning": [i % 6 for i in range(n)],
+    })
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = str(tmp_path / "plays")
+    write_plays(plays(54), root, season=2025, team="Alvernia", row_group_size=18)
+    write_plays(plays(30, "g2"), root, season=2025, team="Messiah")
+    write_plays(plays(12, "g3"), root, season=2024, team="Alvernia")
+    return root
+
+
+def test_round_trip_keeps_rows_and_dtypes(root):
+    df = read_plays(root, season=2025, team="Alvernia")
+    expected = plays(54)
+    assert len(df) == 54
+    assert df["Play Description"].tolist() == expected["Play Description"].tolist()
+    assert df["Bases"].tolist() == [1, 6, 0] * 18
+    for col, dtype in PLAY_DTYPES.items():
+        if dtype == "category":
+            assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+        else:
+            assert df[col].dtype == dtype, col
+    assert df["Play Type"].astype(str).tolist() == expected["Play Type"].tolist()
+    assert df["Game"].astype(str).unique().tolist() == ["g1"]
+
+
+def test_partitions_are_pruned(root):
+    assert partitions(root) == [(2024, "Alvernia"), (2025, "Alvernia"), (2025, "Messiah")]
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    files = [f.path for f in dataset.get_fragments(filter=plays_filter(season=2025, team="Alvernia"))]
+    assert files and all("season=2025" in f and "team=Alvernia" in f for f in files)
+
+    assert len(read_plays(root, season=2025)) == 84
+    assert len(read_plays(root, team=["Alvernia"])) == 66
+    innings = read_plays(root, season=2025, team="Alvernia", innings=(2, 3))
+    assert sorted(innings["Inning"].unique().tolist()) == [2, 3]
+    assert len(innings) == 12
+
+
+def test_rewriting_a_partition_replaces_it(root):
+    write_plays(plays(9, "g4"), root, season=2025, team="Alvernia")
+    df = read_plays(root, season=2025, team="Alvernia")
+    assert len(df) == 9
+    assert df["Game"].astype(str).unique().tolist() == ["g4"]
+    # The other partitions are left alone
+    assert len(read_plays(root, season=2025, team="Messiah")) == 30
+    assert len(read_plays(root, season=2024)) == 12
@@ -0,0 +1,43 @@
+"""SeasonStore keeps games apart, and states_before starts every game empty."""
+
+import pandas as pd
+
+from portfolio.monte_carlo import states_before
+from portfolio.plays import process_rows
+from portfolio.season_store import SeasonStore, game_id
+from portfolio.state_engine import encode
+
+GAMES = {
+    "https://example.edu/boxscore/1": ["Smith singled to left.", "Jones walked.", "Brown flied out to cf."],
+    "https://example.edu/boxscore/2": ["Lee struck out swinging.", "Diaz doubled to rf."],
+}
+
+
+def _raw(descriptions):
+    return pd.DataFrame({"Play Description": descriptions, "Inning": 1, "Half": "Top"})
+
+
+def test_read_keeps_a_game_key(tmp_path):
+    store = SeasonStore(str(tmp_path))
+    for url, plays in GAMES.items():
+        assert store.ingest(url, lambda u: _raw(GAMES[u]), process_rows) == "added"
+
+    season = SeasonStore(str(tmp_path)).read()
+    assert season["Game"].tolist() == [game_id(u) for u, plays in GAMES.items() for _ in plays]
+
+
+def test_read_fills_the_key_for_older_games(tmp_path):
+    store = SeasonStore(str(tmp_path))
+    url = next(iter(GAMES))
+    store.ingest(url, lambda u: _raw(GAMES[u]), process_rows)
+    path = store._path(store.manifest[url])
+    pd.read_csv(path).drop(columns="Game").to_csv(path, index=False)
+    assert set(store.read()["Game"]) == {game_id(url)}
+
+
+def test_states_before_resets_at_a_new_game():
+    # Both games are in the top of the first, so only the Game column separates them
+    plays = pd.DataFrame({"Game": ["a", "a", "b"], "Inning": 1, "Half": "Top",
+                          "Outs": [0, 0, 0], "Bases": [1, 3, 1]})
+    assert states_before(plays).tolist() == [0, encode(0, 1), 0]
+    assert states_before(plays.drop(columns="Game")).tolist() == [0, encode(0, 1), encode(0, 3)]
@@ -0,0 +1,72 @@
+"""load_scrape upserts and rollback on SQLite."""
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from portfolio.sql_loader import load_scrape
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseball.db'}")
+    yield engine
+    engine.dispose()
+
+
+def standings(wins):
+    return pd.DataFrame({
+        "team": ["Alvernia", "DeSales", "York (PA)"],
+        "conference": ["MAC Commonwealth"] * 3,
+        "wins": wins,
+        "losses": [10, 12, 14],
+        "ties": [0, 0, 1],
+        "season_year": [2025] * 3,
+    })
+
+
+def player_batting(hits):
+    return pd.DataFrame({
+        "player": ["Smith, John", "Jones, Evan"],
+        "at_bats": [100, 80],
+        "hits": hits,
+        "season_year": [2025, 2025],
+    })
+
+
+def rows(engine, table, order="team"):
+    with engine.connect() as conn:
+        return pd.read_sql(text(f'SELECT * FROM "{table}" ORDER BY "{order}"'), conn)
+
+
+def test_reloading_updates_rows_instead_of_duplicating(engine):
+    load_scrape(engine, {"conference_standings": standings([20, 18, 15])})
+    report = load_scrape(engine, {"conference_standings": standings([21, 18, 15])})
+    load_scrape(engine, {"conference_standings": standings([21, 18, 15])})
+
+    df = rows(engine, "conference_standings")
+    assert report.rows == {"conference_standings": 3}
+    assert len(df) == 3
+    assert df["wins"].tolist() == [21, 18, 15]
+
+
+def test_team_fills_the_player_key(engine):
+    load_scrape(engine, {"player_batting": player_batting([30, 20])}, team="Alvernia")
+    load_scrape(engine, {"player_batting": player_batting([31, 20])}, team="Alvernia")
+    load_scrape(engine, {"player_batting": player_batting([25, 19])}, team="DeSales")
+
+    df = rows(engine, "player_batting", order="hits")
+    assert len(df) == 4
+    assert sorted(zip(df["team"], df["player"], df["hits"])) == [
+        ("Alvernia", "Jones, Evan", 20), ("Alvernia", "Smith, John", 31),
+        ("DeSales", "Jones, Evan", 19), ("DeSales", "Smith, John", 25)]
+
+
+def test_failing_table_rolls_back_the_whole_scrape(engine):
+    load_scrape(engine, {"conference_standings": standings([20, 18, 15])})
+
+    broken = pd.DataFrame({"conference": ["MAC Commonwealth"], "runs": [300]})  # no team key
+    with pytest.raises(ValueError, match="missing key column"):
+        load_scrape(engine, {"conference_standings": standings([99, 99, 99]), "conference_batting": broken})
+
+    assert rows(engine, "conference_standings")["wins"].tolist() == [20, 18, 15]
@@ -0,0 +1,72 @@
+"""The integer state tables must move runners exactly like update_state."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_play_classifier import make_corpus
+from portfolio.plays import parse_play, process_game, process_games, update_state
+from portfolio.state_engine import (INNING_OVER, N_STATES, NEXT_STATE, PLAY_CODE, PLAY_TYPES, RUNS, bases_to_list,
+                                    decode, double_rbi_runs, encode, run_states)
+
+
+@pytest.mark.parametrize("state", range(N_STATES))
+def test_tables_match_update_state(state):
+    outs, bases = decode(state)
+    for code, play in enumerate(PLAY_TYPES):
+        before = {"outs": outs, "bases": bases_to_list(bases), "runs": 0}
+        after = update_state(play, before)
+        assert NEXT_STATE[state, code] == encode(after["outs"], after["bases"][0] + 2 * after["bases"][1]
+                                                 + 4 * after["bases"][2]), play
+        assert RUNS[state, code] == after["runs"], play
+        assert INNING_OVER[state, code] == (outs + _outs_added(play, bases) >= 3), play
+
+
+def _outs_added(play, bases):
+    if play in ("Out", "Strikeout", "Sacrifice Fly", "Sacrifice Bunt", "Caught Stealing"):
+        return 1
+    if play == "Double Play":
+        return 2
+    if play == "Triple Play":
+        return 3
+    if play in ("Error", "Fielder's Choice"):
+        return int(bases != 0)
+    return 0
+
+
+@pytest.mark.parametrize("desc", ["Smith doubled, 2 RBI.", "Smith doubled, RBI.", "Smith doubled to lf.",
+                                  "Smith doubled, 3 rbi; Jones scored."])
+def test_double_rbi_override_matches_update_state(desc):
+    for state in range(N_STATES):
+        outs, bases = decode(state)
+        expected = update_state("Double", {"outs": outs, "bases": bases_to_list(bases), "runs": 0}, desc)["runs"]
+        override = double_rbi_runs([desc])[0]
+        assert (override if override >= 0 else RUNS[state, PLAY_CODE["Double"]]) == expected
+
+
+# 72 equal games are stepped in lockstep, 5 long ones walked play by play,
+# and games of uneven length exercise the lockstep's shrinking prefix
+@pytest.mark.parametrize("starts", [
+    np.arange(5_000) % 70 == 0,
+    np.arange(5_000) % 1_000 == 0,
+    np.isin(np.arange(5_000), np.r_[0, np.cumsum(np.random.default_rng(3).integers(1, 150, 80))]),
+])
+def test_run_states_matches_the_dict_loop(starts):
+    plays = make_corpus(5_000, seed=2)
+    types = plays.map(parse_play)
+
+    outs, bases, runs = run_states(types.map(PLAY_CODE).to_numpy(), starts, plays.to_numpy())
+
+    state = None
+    for i, (play, desc) in enumerate(zip(types, plays)):
+        if starts[i]:
+            state = {"outs": 0, "bases": [0, 0, 0], "runs": 0}
+        state = update_state(play, state, desc)
+        assert (outs[i], bases_to_list(int(bases[i])), runs[i]) == (state["outs"], state["bases"], state["runs"]), i
+
+
+def test_process_games_without_plays():
+    empty = pd.DataFrame({"Play Description": [], "Inning": [], "Half": []})
+    for df in (process_games([]), process_games([empty, empty], keys=["a", "b"]), process_game(empty)):
+        assert df.empty
+        assert {"Play Description", "Play Type", "Outs", "Bases", "Runs"} <= set(df.columns)
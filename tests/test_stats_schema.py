@@ -0,0 +1,130 @@
+"""normalize() against the cleaners it replaced, on the recorded fixture pages."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.suite import read_fixture
+from portfolio import scrape
+from portfolio.stats_schema import SPECS, clean_conference_stats, clean_team_stats, normalize
+
+# Columns whose name changed on purpose: the old standings rename never matched
+# (it looked for "w" before lower-casing), and "#bat" / "h/9" aren't SQL-safe
+RENAMED = {"tm": "team", "w": "wins", "l": "losses", "#bat": "batters_used", "#p": "pitchers_used",
+           "h/9": "hits_per_9", "hr/9": "homeruns_per_9", "bb/9": "walks_per_9", "so/9": "strikeouts_per_9"}
+
+
+def legacy_conference(batting, pitching, standings):
+    # The pre-stats_schema clean_conference_stats, trimmed to its renames
+    batting = batting[batting["Tm"] != "League Totals"].drop(columns=["Aff", "BatAge", "Conference"], errors="ignore")
+    batting = batting.rename(columns={
+        "R/G": "runs_per_game", "G": "games_played", "PA": "plate_appearances", "AB": "at_bats", "R": "runs",
+        "H": "hits", "2B": "doubles", "3B": "triples", "HR": "homeruns", "RBI": "rbi", "SB": "stolen_bases",
+        "CS": "caught_stealing", "BB": "walks", "SO": "strikeouts", "BA": "avg", "OBP": "obp", "SLG": "slg",
+        "Tm": "team", "OPS": "ops", "TB": "total_bases", "GDP": "gdp", "HBP": "hbp", "SH": "sac_bunts",
+        "SF": "sac_flies", "IBB": "ibb"})
+    batting.columns = [c.strip().lower() for c in batting.columns]
+
+    pitching = pitching[pitching["Tm"] != "League Totals"]
+    pitching = pitching.drop(columns=["Aff", "PAge", "GS", "GF", "W-L%", "Conference"], errors="ignore")
+    pitching = pitching.rename(columns={
+        "Tm": "team", "RA9": "RA/9", "H9": "H/9", "HR9": "HR/9", "BB9": "BB/9", "SO9": "SO/9",
+        "R/G": "runs_per_game", "W": "wins", "L": "losses", "ERA": "era", "RA/9": "runs_per_9",
+        "G": "games_played", "CG": "complete_games", "SHO": "shutouts", "SV": "saves", "IP": "innings_pitched",
+        "H": "hits", "R": "runs", "ER": "earned_runs", "HR": "homeruns", "BB": "walks", "IBB": "ibb",
+        "HBP": "hbp", "BK": "bk", "WP": "wp", "SO": "strikeouts", "BF": "bf", "WHIP": "whip",
+        "H/9": "hits_per_9", "HR/9": "homeruns_per_9", "BB/9": "walks_per_9", "SO/9": "strikeouts_per_9",
+        "SO/W": "strikeout_to_walk"})
+    pitching.columns = [c.strip().lower() for c in pitching.columns]
+
+    standings = standings.drop(columns=["GB", "W-L%"], errors="ignore")
+    if "Ties" not in standings.columns:
+        standings["Ties"] = 0
+    standings.columns = [c.strip().lower() for c in standings.columns]
+    return batting, pitching, standings
+
+
+def legacy_team(batting, pitching, fielding):
+    # The pre-stats_schema clean_team_stats
+    def players(df):
+        df = df[~df["Player"].str.contains("Total|Opponents", na=False)].copy()
+        df["Player"] = df["Player"].str.split(r"\d", n=1).str[0].str.rstrip(", ")
+        return df.drop(columns=["#", "Bio Link"])
+
+    batting = players(batting)
+    batting[["SB", "SBA"]] = batting["SB-ATT"].str.split("-", expand=True)
+    batting[["GP", "GS"]] = batting["GP-GS"].str.split("-", expand=True)
+    batting = batting.drop(columns=["GP-GS", "SB-ATT"]).rename(columns={
+        "GP": "games_played", "GS": "games_started", "AB": "at_bats", "R": "runs", "H": "hits", "2B": "doubles",
+        "3B": "triples", "HR": "homeruns", "RBI": "rbi", "SB": "stolen_bases", "SBA": "stolen_base_attempts",
+        "BB": "walks", "SO": "strikeouts", "AVG": "avg", "OB%": "obp", "SLG%": "slg", "OPS": "ops",
+        "TB": "total_bases", "GDP": "gdp", "HBP": "hbp", "SH": "sac_bunts", "SF": "sac_flies"})
+
+    pitching = players(pitching)
+    pitching[["APP", "GS"]] = pitching["APP-GS"].str.split("-", expand=True)
+    pitching[["W", "L"]] = pitching["W-L"].str.split("-", expand=True)
+    pitching = pitching.drop(columns=["APP-GS", "SHO", "W-L"]).rename(columns={
+        "W": "wins", "L": "losses", "ERA": "era", "GS": "games_started", "APP": "appearances",
+        "CG": "complete_games", "SV": "saves", "IP": "innings_pitched", "H": "hits", "R": "runs",
+        "ER": "earned_runs", "2B": "doubles", "3B": "triples", "HR": "homeruns", "BB": "walks", "HBP": "hbp",
+        "BK": "bk", "WP": "wp", "SFA": "sac_flies", "SHA": "sac_bunts", "WHIP": "whip", "SO": "strikeouts",
+        "AB": "at_bats", "B/AVG": "batting_avg_against"})
+
+    fielding = players(fielding).rename(columns={
+        "CSB": "cs", "C": "chances", "PO": "putouts", "A": "assists", "E": "errors", "FLD%": "fielding_pct",
+        "DP": "double_plays", "SBA": "sba", "PB": "pb", "CI": "ci"})
+    return batting, pitching, fielding
+
+
+@pytest.fixture(scope="module")
+def pages():
+    team = scrape.TEAM_TABLES(read_fixture("team_stats"))
+    conference = scrape.CONFERENCE_TABLES(read_fixture("conference"))
+    return ((team["individual_batting"], team["individual_pitching"], team["individual_fielding"]),
+            (conference["batting"], conference["pitching"], conference["standings"]))
+
+
+def assert_same_values(old, new):
+    assert len(old) == len(new)
+    for col in old.columns:
+        target = RENAMED.get(col, col)
+        assert target in new.columns, col
+        values = new[target].reset_index(drop=True)
+        before = old[col].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(values):
+            expected = pd.to_numeric(before.astype("string").str.replace(",", "").str.strip(), errors="coerce")
+            np.testing.assert_allclose(values.astype("float64"), expected.astype("float64"), err_msg=col)
+        else:
+            assert values.astype(str).tolist() == before.astype(str).str.strip().tolist(), col
+    # Nothing is left as object strings
+    assert not [c for c, dtype in new.dtypes.items() if dtype == object]
+
+
+def test_team_tables_match_the_old_cleaners(pages):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        old = legacy_team(*(t.copy() for t in pages[0]))
+    for before, after in zip(old, clean_team_stats(*pages[0])):
+        assert "Player" in after.columns
+        assert_same_values(before, after)
+
+
+def test_conference_tables_match_the_old_cleaners(pages):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        old = legacy_conference(*(t.copy() for t in pages[1]))
+    for before, after in zip(old, clean_conference_stats(*pages[1])):
+        assert_same_values(before, after)
+
+
+def test_unlisted_columns_come_out_typed():
+    raw = pd.DataFrame({"Player": ["Smith, John 12", "Totals"], "AB": ["10", "10"], "PA": ["12", "12"],
+                        "XBH": ["3", "3"], "Pos": ["SS", "-"], "RATE": ["0.5", "-"]})
+    df = normalize(raw, SPECS["player_batting"], 2025, team="Alvernia")
+    assert df["Player"].tolist() == ["Smith, John"]
+    assert str(df["plate_appearances"].dtype) == "Int32"
+    assert str(df["xbh"].dtype) == "Int32"
+    assert str(df["pos"].dtype) == "string"
+    assert df["rate"].dtype == "float64"
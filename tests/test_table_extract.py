@@ -0,0 +1,70 @@
+"""TableExtractor on the recorded fixture pages in benchmarks/fixtures."""
+
+import pytest
+
+from benchmarks.suite import read_fixture
+from portfolio.boxscores import PLAY_BY_PLAY
+from portfolio.fetch import has_play_by_play, read_tables
+from portfolio.scrape import CONFERENCE_TABLES, TEAM_TABLES
+from portfolio.table_extract import TableExtractor, TableNotFound, TableSignature
+
+
+@pytest.fixture(scope="module")
+def box_score():
+    return read_fixture("box_score")
+
+
+def test_header_signatures_pick_the_conference_tables():
+    tables = CONFERENCE_TABLES.require(CONFERENCE_TABLES(read_fixture("conference")))
+    # Standings has Tm/W/L like team pitching, which its exclude keeps out
+    assert list(tables["standings"].columns) == ["Tm", "W", "L", "W-L%", "GB"]
+    assert {"BA", "OBP", "SLG"} <= set(tables["batting"].columns)
+    assert {"ERA", "WHIP"} <= set(tables["pitching"].columns)
+    # The scan stops once everything is found, before the fielding table
+    assert len(tables.seen) == 3
+
+
+def test_team_tables_are_all_found():
+    tables = TEAM_TABLES(read_fixture("team_stats"))
+    assert TEAM_TABLES.ready(tables)
+    assert "GP-GS" in tables["individual_batting"].columns
+    assert "APP-GS" in tables["individual_pitching"].columns
+
+
+def test_many_returns_every_match_in_page_order(box_score):
+    plays = PLAY_BY_PLAY(box_score)["plays"]
+    expected = [t for t in read_tables(box_score) if has_play_by_play([t])]
+    assert len(plays) == len(expected) == 19
+    for got, want in zip(plays, expected):
+        assert got.equals(want)
+
+
+def test_index_picks_a_later_match(box_score):
+    plays = PLAY_BY_PLAY(box_score)["plays"]
+    third = TableExtractor(TableSignature("third", headers=["Play Description"], exclude=["Logo"], index=2))
+    assert third(box_score)["third"].equals(plays[2])
+
+
+def test_caption_regex(box_score):
+    bottom = TableExtractor(TableSignature("bottom_2", headers=["Play Description"], caption=r"Bottom of 2$"))
+    table = bottom(box_score)["bottom_2"]
+    assert table.equals(PLAY_BY_PLAY(box_score)["plays"][3])
+
+
+def test_table_not_found_lists_the_header_rows(box_score):
+    extractor = TableExtractor(TableSignature("pitching", headers=["ERA", "WHIP"]),
+                               TableSignature("optional", headers=["Nope"], required=False))
+    tables = extractor(box_score)
+    assert extractor.missing(tables) == ["pitching"]
+    with pytest.raises(TableNotFound) as raised:
+        extractor.require(tables, "https://example.edu/box")
+    message = str(raised.value)
+    assert message.startswith("https://example.edu/box: no table matching ['pitching']")
+    assert "['Logo', 'Inning', 'Play Description', 'Score']" in message
+    assert message.count("\n") == len(tables.seen)
+
+
+def test_pages_without_tables():
+    assert PLAY_BY_PLAY("") == {}
+    with pytest.raises(TableNotFound, match=r"\(none\)"):
+        PLAY_BY_PLAY.require(PLAY_BY_PLAY("<p>No tables yet</p>"))